@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Analyze a corpus of lyrics across all cores and stream results as JSONL
+
+Input is either a directory of .txt files (one song per file) or a JSONL
+file with one {"id", "text", "sensitivity"} object per line ("lyrics" is
+accepted in place of "text"). Each song goes through find_all_rhymes, which
+also runs calculate_rhyme_score, and one JSON line is written per song.
+
+    python analyze_corpus.py lyrics/ > results.jsonl
+    python analyze_corpus.py songs.jsonl --workers 8 --output results.jsonl --full
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# app prints Genius setup status on import; keep stdout clean for the JSONL stream
+with contextlib.redirect_stdout(sys.stderr):
+    import app
+
+def iter_corpus(source, default_sensitivity):
+    """Yield (id, text, sensitivity) for every song in a directory or JSONL file
+
+    Malformed JSONL records are skipped with a warning naming their line.
+    """
+    source = Path(source)
+
+    if source.is_dir():
+        for path in sorted(source.rglob('*.txt')):
+            yield str(path.relative_to(source)), path.read_text(encoding='utf-8', errors='replace'), default_sensitivity
+        return
+
+    with open(source, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠ Warning: Skipping line {line_number} of {source}: invalid JSON ({e})", file=sys.stderr)
+                continue
+            if not isinstance(record, dict):
+                print(f"⚠ Warning: Skipping line {line_number} of {source}: expected an object", file=sys.stderr)
+                continue
+
+            song_id = record.get('id', line_number)
+            text = record.get('text', record.get('lyrics', ''))
+            if not isinstance(text, str):
+                print(f"⚠ Warning: Skipping line {line_number} of {source}: text is not a string", file=sys.stderr)
+                continue
+            yield song_id, text, record.get('sensitivity', default_sensitivity)
+
+def init_worker():
+    """Load the CMU dictionary and rhyme index once per worker process"""
+    # A no-op for forked workers, which inherit the parent's loaded index, and
+    # whenever the prebuilt phonetic store is serving lookups instead
+    if app.phonetic_store is None:
+        app.pronouncing.init_cmu()
+
+def analyze_song(task):
+    """Analyze one song, returning a JSON-ready result (errors are reported, not raised)"""
+    song_id, text, sensitivity, full = task
+
+    if not text or not text.strip():
+        return {'id': song_id, 'error': 'No text provided'}
+
+    try:
+        analysis = app.find_all_rhymes(text, app.sensitivity_to_threshold(sensitivity))
+    except Exception as e:
+        return {'id': song_id, 'error': f'Analysis failed: {str(e)}'}
+
+    if full:
+        return {'id': song_id, **analysis}
+
+    return {
+        'id': song_id,
+        'score': analysis['score'],
+        'groups': [
+            {
+                'letter': group['letter'],
+                'rhyme_sound': group['syllable_info']['rhyme_sound'],
+                'words': [w['clean'] for w in group['words']]
+            }
+            for group in analysis['groups']
+        ]
+    }
+
+def throttled(tasks, slots):
+    """Hold back tasks until a result slot frees up, so huge corpora aren't read into memory"""
+    for task in tasks:
+        slots.acquire()
+        yield task
+
+def analyze_corpus(source, output, workers=None, sensitivity=70, full=False, chunksize=4):
+    """Run every song through a process pool and write one JSON line per song"""
+    workers = workers or os.cpu_count() or 1
+    slots = threading.BoundedSemaphore(workers * chunksize * 4)
+    tasks = ((song_id, text, song_sensitivity, full)
+             for song_id, text, song_sensitivity in iter_corpus(source, sensitivity))
+
+    count = 0
+    with Pool(workers, initializer=init_worker) as pool:
+        for result in pool.imap(analyze_song, throttled(tasks, slots), chunksize=chunksize):
+            slots.release()
+            output.write(json.dumps(result) + '\n')
+            count += 1
+            if count % 100 == 0:
+                output.flush()
+
+    output.flush()
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='directory of .txt lyrics or a JSONL file')
+    parser.add_argument('--output', '-o', help='JSONL output path (default: stdout)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--sensitivity', '-s', type=int, default=70,
+                        help='default sensitivity 0-100 for songs that do not set one')
+    parser.add_argument('--chunksize', type=int, default=4,
+                        help='songs handed to a worker at a time')
+    parser.add_argument('--full', action='store_true',
+                        help='write the full /analyze response instead of score and groups')
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            total = analyze_corpus(args.source, out, args.workers, args.sensitivity, args.full, args.chunksize)
+    else:
+        total = analyze_corpus(args.source, sys.stdout, args.workers, args.sensitivity, args.full, args.chunksize)
+
+    print(f"Analyzed {total} songs", file=sys.stderr)
@@ -1,13 +1,29 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import bisect
+import codecs
+import math
 import re
-import pronouncing
-import requests
+import threading
+import time
+import uuid
 from urllib.parse import quote
 import lyricsgenius
 import os
+from collections import namedtuple, OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from bs4 import BeautifulSoup
+import numpy as np
+from lyrics_cache import LyricsCache, DEFAULT_PATH as LYRICS_CACHE_DEFAULT_PATH
+from response_cache import ResponseCache, normalize_text, response_key
+from http_pool import PooledHTTPClient
+from lyrics_extractor import extract_lyrics_containers
+from metrics import Metrics, NULL_CONTEXT
+from profiler import SlowRequestProfiler
+from letter_to_sound import guess_pronunciation, join_pieces
+from multisyllabic import find_multisyllabic_rhymes as find_vowel_chains
+from phonetic_store import PhoneticStore, DEFAULT_PATH as DEFAULT_STORE_PATH, rhyming_part
 
 app = Flask(__name__)
 CORS(app)
@@ -49,6 +65,81 @@ else:
     print("⚠ Warning: No Genius API token found. Create a .env file with GENIUS_ACCESS_TOKEN.")
     genius = None
 
+def init_lyrics_cache():
+    """Set up the persistent lyrics cache (set LYRICS_CACHE_PATH to empty to disable)
+
+    The SQLite file is opened on first use in each process, so nothing is
+    opened at import time, before gunicorn or a process pool forks.
+    """
+    path = os.getenv('LYRICS_CACHE_PATH', str(LYRICS_CACHE_DEFAULT_PATH))
+    if not path:
+        return None
+
+    if not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+        print(f"⚠ Warning: Failed to open lyrics cache at {path}: directory does not exist")
+        return None
+    return LyricsCache(
+        path,
+        ttl=float(os.getenv('LYRICS_CACHE_TTL', str(7 * 24 * 3600))),
+        max_entries=int(os.getenv('LYRICS_CACHE_MAX_ENTRIES', '10000'))
+    )
+
+lyrics_cache = init_lyrics_cache()
+
+def init_response_cache():
+    """Open the /analyze response cache (set RESPONSE_CACHE_MAX_BYTES=0 to disable)"""
+    max_bytes = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    if max_bytes <= 0:
+        return None
+
+    # The disk tier opens on first use; if it can't, the cache reports it and stays in memory
+    return ResponseCache(
+        max_bytes,
+        path=os.getenv('RESPONSE_CACHE_PATH', '') or None,
+        max_disk_bytes=int(os.getenv('RESPONSE_CACHE_DISK_MAX_BYTES', str(512 * 1024 * 1024)))
+    )
+
+response_cache = init_response_cache()
+
+# Stage timings and counters for /metrics (set METRICS_ENABLED=0 to record nothing)
+metrics = Metrics(enabled=os.getenv('METRICS_ENABLED', '1') != '0')
+metrics.describe('rhyme_analysis_stage_seconds', 'histogram', 'Time spent in each rhyme analysis stage')
+metrics.describe('rhyme_analyses_total', 'counter', 'Rhyme analyses run')
+metrics.describe('rhyme_words_extracted_total', 'counter', 'Words extracted for analysis')
+metrics.describe('rhyme_phone_lookups_total', 'counter', 'Pronunciations resolved (CMU, compounds or letter-to-sound)')
+metrics.describe('rhyme_pairs_compared_total', 'counter', 'Word pairs considered while grouping')
+metrics.describe('rhyme_request_seconds', 'histogram', 'Time to answer analysis and lyrics requests')
+metrics.describe('genius_request_seconds', 'histogram', 'Latency of Genius API searches and page scrapes')
+
+def init_slow_request_profiler():
+    """Stack-sample /analyze and /search-lyrics requests over budget (opt in with SLOW_REQUEST_PROFILING=1)"""
+    if os.getenv('SLOW_REQUEST_PROFILING', '0') != '1':
+        return None
+    return SlowRequestProfiler(
+        budget=float(os.getenv('SLOW_REQUEST_BUDGET_MS', '1000')) / 1000,
+        interval=float(os.getenv('SLOW_REQUEST_SAMPLE_INTERVAL_MS', '5')) / 1000,
+        max_profiles=int(os.getenv('SLOW_REQUEST_PROFILES', '20'))
+    )
+
+slow_request_profiler = init_slow_request_profiler()
+
+def profile_request(endpoint, describe):
+    """Profile the enclosed request if it runs over the slow-request budget"""
+    if slow_request_profiler is None:
+        return NULL_CONTEXT
+    return slow_request_profiler.profile(endpoint, describe)
+
+# Bump when analysis results or the response format change, so responses cached on disk are not reused
+ANALYSIS_VERSION = 1
+
+# Shared keep-alive connection pool for api.genius.com and genius.com
+http_client = PooledHTTPClient(
+    pool_size=int(os.getenv('HTTP_POOL_SIZE', '10')),
+    max_retries=int(os.getenv('HTTP_MAX_RETRIES', '3')),
+    backoff_factor=float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5')),
+    per_host_limit=int(os.getenv('HTTP_PER_HOST_LIMIT', '4'))
+)
+
 @app.route('/')
 def index():
     return send_from_directory('.', 'index.html')
@@ -70,8 +161,72 @@ def test_genius():
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'API test failed: {str(e)}'})
 
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Report hit/miss counters for the phonetic similarity and response caches"""
+    stats = similarity_cache_stats()
+    if response_cache:
+        stats['responses'] = response_cache.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings, counters, cache statistics and Genius latencies in Prometheus text format"""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled (METRICS_ENABLED=0)'}), 404
+
+    caches = similarity_cache_stats()
+    extra = [
+        ('rhyme_cache_hits_total', 'counter', 'Hits in the in-process phonetic caches',
+         [({'cache': name}, stats['hits']) for name, stats in caches.items()]),
+        ('rhyme_cache_misses_total', 'counter', 'Misses in the in-process phonetic caches',
+         [({'cache': name}, stats['misses']) for name, stats in caches.items()]),
+        ('rhyme_cache_entries', 'gauge', 'Entries held in the in-process phonetic caches',
+         [({'cache': name}, stats['size']) for name, stats in caches.items()]),
+    ]
+    if response_cache:
+        responses = response_cache.stats()
+        extra += [
+            ('rhyme_response_cache_hits_total', 'counter', 'Analyses served from the response cache',
+             [({'tier': 'memory'}, responses['hits']), ({'tier': 'disk'}, responses['disk_hits'])]),
+            ('rhyme_response_cache_misses_total', 'counter', 'Analyses not found in the response cache',
+             [({}, responses['misses'])]),
+            ('rhyme_response_cache_bytes', 'gauge', 'Bytes of responses held in memory',
+             [({}, responses['bytes'])]),
+        ]
+
+    return Response(metrics.render(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/debug/slow-requests', methods=['GET'])
+def slow_requests():
+    """Stack-sample dumps of the most recent requests that ran over the latency budget"""
+    if slow_request_profiler is None:
+        return jsonify({'error': 'Slow request profiling is off (set SLOW_REQUEST_PROFILING=1)'}), 404
+    return jsonify({
+        'budget_ms': slow_request_profiler.budget * 1000,
+        'profiles': slow_request_profiler.dumps()
+    })
+
 @app.route('/analyze', methods=['POST'])
 def analyze_rhyme_scheme():
+    with metrics.timer('rhyme_request_seconds', endpoint='analyze'), \
+            profile_request('analyze', describe_analyze_request):
+        return analyze_text()
+
+def describe_analyze_request():
+    """Request details kept with a slow /analyze profile"""
+    data = request.get_json(silent=True)
+    data = data if isinstance(data, dict) else {}
+    text = data.get('text')
+    return {
+        'word_count': len(text.split()) if isinstance(text, str) else 0,
+        'line_count': text.count('\n') + 1 if isinstance(text, str) else 0,
+        'sensitivity': data.get('sensitivity', 70),
+        'multisyllabic': bool(data.get('multisyllabic'))
+    }
+
+def analyze_text():
+    """The /analyze handler, timed as a whole by analyze_rhyme_scheme"""
     try:
         data = request.get_json()
         text = data.get('text', '')
@@ -80,20 +235,226 @@ def analyze_rhyme_scheme():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
 
-        # Convert percentage to threshold with better mapping
-        # 0% = 0.95 (near perfect only), 50% = 0.7 (balanced), 100% = 0.4 (loose)
-        if sensitivity <= 50:
-            # 0-50%: 0.95 to 0.7 (strict to balanced)
-            threshold = 0.95 - (sensitivity / 50.0 * 0.25)
-        else:
-            # 50-100%: 0.7 to 0.4 (balanced to loose)
-            threshold = 0.7 - ((sensitivity - 50) / 50.0 * 0.3)
+        # Analyze the normalized text, so a cached response is exactly what a fresh one would be
+        text = normalize_text(text)
+        threshold = sensitivity_to_threshold(sensitivity)
+        multisyllabic = bool(data.get('multisyllabic'))
+        # Timings describe one run, so those requests always analyze and are never cached
+        timings = bool(data.get('timings')) and metrics.enabled
+
+        cache_key = None
+        if response_cache and not timings:
+            cache_key = analysis_cache_key(text, threshold, multisyllabic)
+            body = response_cache.get(cache_key)
+            if body is not None:
+                return Response(body, mimetype=app.json.mimetype, headers={'X-Cache': 'HIT'})
+
+        phones_lookup = {}
+        with metrics.request() as request_metrics:
+            analysis = find_all_rhymes(text, threshold, phones_lookup)
+            if multisyllabic:
+                with metrics.stage('multisyllabic'):
+                    analysis['multisyllabic_rhymes'] = find_multisyllabic_rhymes(text, phones_lookup)
+
+        if timings:
+            analysis['timings'] = {
+                'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in request_metrics['stages'].items()},
+                'counts': request_metrics['counts']
+            }
+
+        response = jsonify(analysis)
+        if cache_key:
+            response_cache.put(cache_key, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+        return response
+    except Exception as e:
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+def analysis_cache_key(text, threshold, multisyllabic=False):
+    """Response cache key for an analysis of normalized text"""
+    namespace = f"v{ANALYSIS_VERSION}:lts={int(LETTER_TO_SOUND)}:multisyllabic={int(multisyllabic)}"
+    return response_key(text, threshold, namespace)
+
+def with_fields(body, **fields):
+    """A serialized JSON object with more fields appended, without decoding it"""
+    extra = app.json.dumps(fields).encode('utf-8')
+    return body.rstrip()[:-1] + b', ' + extra[1:]
+
+@app.route('/scheme', methods=['POST'])
+def analyze_line_scheme():
+    """Label each line's end word (ABAB...) without grouping the rest of the text"""
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+
+        return jsonify(find_rhyme_scheme(text))
+    except Exception as e:
+        return jsonify({'error': f'Scheme analysis failed: {str(e)}'}), 500
+
+@app.route('/analyze-stream', methods=['POST'])
+def analyze_rhyme_scheme_stream():
+    """Stream the /analyze result as NDJSON, one rhyme group per line as each is found"""
+    data = request.get_json(silent=True)
+    # Lists, strings and malformed bodies carry no text, and are rejected below
+    data = data if isinstance(data, dict) else {}
+    text = data.get('text', '')
+    sensitivity = data.get('sensitivity', 70)
+
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    # Normalized like /analyze, so the streamed result matches it exactly
+    text = normalize_text(text)
+    threshold = sensitivity_to_threshold(sensitivity)
+    return Response(stream_with_context(stream_rhyme_analysis(text, threshold)),
+                    mimetype='application/x-ndjson')
+
+def stream_rhyme_analysis(text, threshold=0.7):
+    """Yield NDJSON lines: the text's lines, the line scheme, each group with its highlights, then the score
+
+    Groups are sent as group_rhyme_words finalizes them, so the first
+    highlights arrive before later groups are searched for.
+    """
+    try:
+        lines = text.split('\n')
+        yield app.json.dumps({'event': 'lines', 'lines': lines}) + '\n'
+
+        # Repeated words are resolved once, shortening the wait before the first group
+        all_words = extract_words(lines, {})
+        scheme = rhyme_scheme(line_end_words(all_words, len(lines)))
+        yield app.json.dumps({'event': 'scheme', 'scheme': scheme}) + '\n'
+
+        rhyme_groups = []
+        for group in label_rhyme_groups(group_rhyme_words(all_words, threshold)):
+            rhyme_groups.append(group)
+            yield app.json.dumps({
+                'event': 'group',
+                'group': group,
+                'syllable_highlights': create_syllable_highlights([group])
+            }) + '\n'
+
+        score = calculate_rhyme_score(text, rhyme_groups, threshold)
+        yield app.json.dumps({'event': 'score', 'score': score}) + '\n'
+    except Exception as e:
+        yield app.json.dumps({'event': 'error', 'error': f'Analysis failed: {str(e)}'}) + '\n'
+
+# Upper bound on texts per /analyze-batch request
+MAX_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', '1000'))
+
+@app.route('/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """Analyze many texts in one request, sharing phone lookups across the batch"""
+    try:
+        data = request.get_json()
+        items = data.get('items') if isinstance(data, dict) else data
+
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Provide a non-empty list of {text, sensitivity} items'}), 400
+
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({'error': f'Batch too large: {len(items)} items (max {MAX_BATCH_ITEMS})'}), 413
+
+        # One lookup table for the whole batch, so each distinct word is resolved once
+        phones_lookup = {}
+        results = []
+
+        for item in items:
+            if not isinstance(item, dict) or not item.get('text'):
+                results.append({'error': 'No text provided'})
+                continue
+
+            try:
+                threshold = sensitivity_to_threshold(item.get('sensitivity', 70))
+                results.append(find_all_rhymes(normalize_text(item['text']), threshold, phones_lookup))
+            except Exception as e:
+                results.append({'error': f'Analysis failed: {str(e)}'})
+
+        return jsonify(results)
+    except Exception as e:
+        return jsonify({'error': f'Batch analysis failed: {str(e)}'}), 500
+
+@app.route('/analyze-session', methods=['POST'])
+def create_analysis_session():
+    """Start an editing session and return its first analysis"""
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+
+        if not text:
+            return jsonify({'error': 'No text provided'}), 400
+
+        threshold = sensitivity_to_threshold(data.get('sensitivity', 70))
+        session_id, document = analysis_sessions.create(text, threshold)
+        with document.lock:
+            # The first analysis is what /analyze returns for the text, so it can come from the response
+            # cache. Only for normalized text: the document keeps the client's lines for its diffs.
+            cache_key = None
+            if response_cache and text == normalize_text(text):
+                cache_key = analysis_cache_key(text, threshold)
+                body = response_cache.get(cache_key)
+                if body is not None:
+                    return Response(with_fields(body, session_id=session_id, version=document.version),
+                                    mimetype=app.json.mimetype, headers={'X-Cache': 'HIT'})
+
+            body = jsonify(document.analyze()).get_data()
+            if cache_key:
+                response_cache.put(cache_key, body)
+            return Response(with_fields(body, session_id=session_id, version=document.version),
+                            mimetype=app.json.mimetype, headers={'X-Cache': 'MISS'} if cache_key else {})
+    except Exception as e:
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+@app.route('/analyze-session/<session_id>', methods=['PATCH'])
+def edit_analysis_session(session_id):
+    """Apply line-level edits to a session and return the updated analysis"""
+    try:
+        document = analysis_sessions.get(session_id)
+        if document is None:
+            return jsonify({'error': 'Unknown or expired session'}), 404
+
+        data = request.get_json()
+        with document.lock:
+            base_version = data.get('base_version')
+            if base_version is not None and base_version != document.version and 'text' not in data:
+                return jsonify({'error': 'Session has changed; resend the full text',
+                                'version': document.version}), 409
+
+            try:
+                if 'text' in data:
+                    document.replace_text(data['text'])
+                else:
+                    document.apply_changes(data.get('changes', []))
+            except ValueError as e:
+                return jsonify({'error': str(e), 'version': document.version}), 400
+
+            if 'sensitivity' in data:
+                document.set_threshold(sensitivity_to_threshold(data['sensitivity']))
 
-        analysis = find_all_rhymes(text, threshold)
-        return jsonify(analysis)
+            return jsonify({**document.analyze(), 'session_id': session_id, 'version': document.version})
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/analyze-session/<session_id>', methods=['DELETE'])
+def delete_analysis_session(session_id):
+    """End an editing session"""
+    if not analysis_sessions.delete(session_id):
+        return jsonify({'error': 'Unknown or expired session'}), 404
+    return jsonify({'deleted': session_id})
+
+def sensitivity_to_threshold(sensitivity):
+    """Map the 0-100% sensitivity slider to a similarity threshold"""
+    # Convert percentage to threshold with better mapping
+    # 0% = 0.95 (near perfect only), 50% = 0.7 (balanced), 100% = 0.4 (loose)
+    if sensitivity <= 50:
+        # 0-50%: 0.95 to 0.7 (strict to balanced)
+        return 0.95 - (sensitivity / 50.0 * 0.25)
+    else:
+        # 50-100%: 0.7 to 0.4 (balanced to loose)
+        return 0.7 - ((sensitivity - 50) / 50.0 * 0.3)
+
 @app.route('/search-lyrics', methods=['POST'])
 def search_lyrics():
     try:
@@ -104,101 +465,127 @@ def search_lyrics():
         if not artist or not song:
             return jsonify({'error': 'Artist and song name are required'}), 400
 
-        # Check if Genius API is available
-        if not genius:
-            return jsonify({
-                'success': False,
-                'error': 'Genius API not configured. Please set up GENIUS_ACCESS_TOKEN in .env file.'
-            }), 503
+        with metrics.timer('rhyme_request_seconds', endpoint='search_lyrics'), \
+                profile_request('search_lyrics', lambda: {'artist': artist, 'song': song}):
+            payload, status = lookup_lyrics(artist, song)
+        return jsonify(payload), status
+
+    except Exception as e:
+        print(f"Search error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Search failed: {str(e)}'
+        }), 500
 
-        try:
-            # Search for the song using direct Genius API calls
-            print(f"Searching for: {artist} - {song}")
+def lookup_lyrics(artist, song):
+    """Find a song on Genius and scrape its lyrics, returning (response payload, status)"""
+    # Repeat lookups are served from the persistent cache without any network I/O
+    cached = lyrics_cache.get(artist, song) if lyrics_cache else None
+    if cached:
+        return {**cached, 'cached': True}, 200
 
-            # Search for the song
-            search_query = f"{song} {artist}"
-            search_url = f"https://api.genius.com/search?q={quote(search_query)}"
+    # Check if Genius API is available
+    if not genius:
+        return {
+            'success': False,
+            'error': 'Genius API not configured. Please set up GENIUS_ACCESS_TOKEN in .env file.'
+        }, 503
 
-            headers = {
-                'Authorization': f'Bearer {genius_token}',
-                'User-Agent': 'RhymeScheme'
-            }
+    try:
+        # Search for the song using direct Genius API calls
+        print(f"Searching for: {artist} - {song}")
+        with metrics.timer('genius_request_seconds', operation='search'):
+            hits = search_genius(artist, song)
+
+        if not hits:
+            return {
+                'success': False,
+                'error': f'No songs found for "{song}" by {artist}. Try different search terms.'
+            }, 404
 
-            # Search for the song
-            search_response = requests.get(search_url, headers=headers, timeout=10)
-            search_response.raise_for_status()
+        best_match = find_best_match(hits, artist, song)
 
-            search_data = search_response.json()
-            hits = search_data.get('response', {}).get('hits', [])
+        if best_match:
+            song_id = best_match.get('id')
+            song_title = best_match.get('title')
+            artist_name = best_match.get('primary_artist', {}).get('name')
+            song_url = best_match.get('url')
 
-            if not hits:
-                return jsonify({
-                    'success': False,
-                    'error': f'No songs found for "{song}" by {artist}. Try different search terms.'
-                }), 404
-
-            # Find the best match
-            best_match = None
-            for hit in hits:
-                result = hit.get('result', {})
-                song_title = result.get('title', '').lower()
-                artist_name = result.get('primary_artist', {}).get('name', '').lower()
-
-                # Simple matching logic
-                if (song.lower() in song_title or song_title in song.lower()) and \
-                   (artist.lower() in artist_name or artist_name in artist.lower()):
-                    best_match = result
-                    break
-
-            # If no exact match, use the first result
-            if not best_match and hits:
-                best_match = hits[0].get('result', {})
-
-            if best_match:
-                song_id = best_match.get('id')
-                song_title = best_match.get('title')
-                artist_name = best_match.get('primary_artist', {}).get('name')
-                song_url = best_match.get('url')
-
-                # Get lyrics by scraping the song page
+            # A different search may already have cached this song
+            cached = lyrics_cache.get_by_id(song_id) if lyrics_cache else None
+            if cached:
+                lyrics_cache.link(artist, song, song_id)
+                return {**cached, 'cached': True}, 200
+
+            # Get lyrics by scraping the song page
+            with metrics.timer('genius_request_seconds', operation='scrape'):
                 lyrics = scrape_genius_lyrics(song_url)
 
-                if lyrics:
-                    song_info = {
-                        'success': True,
-                        'lyrics': lyrics,
-                        'artist': artist_name,
-                        'song': song_title,
-                        'url': song_url,
-                        'genius_id': song_id
-                    }
-
-                    print(f"✓ Found lyrics for: {artist_name} - {song_title}")
-                    return jsonify(song_info)
-                else:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Found song but could not retrieve lyrics for "{song_title}" by {artist_name}'
-                    }), 404
+            if lyrics:
+                song_info = {
+                    'success': True,
+                    'lyrics': lyrics,
+                    'artist': artist_name,
+                    'song': song_title,
+                    'url': song_url,
+                    'genius_id': song_id
+                }
+
+                if lyrics_cache:
+                    lyrics_cache.put(artist, song, song_info)
+
+                print(f"✓ Found lyrics for: {artist_name} - {song_title}")
+                return song_info, 200
             else:
-                return jsonify({
+                return {
                     'success': False,
-                    'error': f'No matching songs found for "{song}" by {artist}'
-                }), 404
-
-        except Exception as e:
-            print(f"Genius API error: {str(e)}")
-            return jsonify({
+                    'error': f'Found song but could not retrieve lyrics for "{song_title}" by {artist_name}'
+                }, 404
+        else:
+            return {
                 'success': False,
-                'error': f'Failed to fetch lyrics: {str(e)}'
-            }), 503
+                'error': f'No matching songs found for "{song}" by {artist}'
+            }, 404
 
     except Exception as e:
-        print(f"Search error: {str(e)}")
-        return jsonify({
+        print(f"Genius API error: {str(e)}")
+        return {
             'success': False,
-            'error': f'Search failed: {str(e)}'
-        }), 500
+            'error': f'Failed to fetch lyrics: {str(e)}'
+        }, 503
+
+def search_genius(artist, song):
+    """Search the Genius API and return the raw hits"""
+    search_query = f"{song} {artist}"
+    search_url = f"https://api.genius.com/search?q={quote(search_query)}"
+
+    headers = {
+        'Authorization': f'Bearer {genius_token}',
+        'User-Agent': 'RhymeScheme'
+    }
+
+    search_response = http_client.get(search_url, headers=headers, timeout=10)
+    search_response.raise_for_status()
+
+    search_data = search_response.json()
+    return search_data.get('response', {}).get('hits', [])
+
+def find_best_match(hits, artist, song):
+    """Pick the hit whose title and artist match the query, else the first hit"""
+    for hit in hits:
+        result = hit.get('result', {})
+        song_title = result.get('title', '').lower()
+        artist_name = result.get('primary_artist', {}).get('name', '').lower()
+
+        # Simple matching logic
+        if (song.lower() in song_title or song_title in song.lower()) and \
+           (artist.lower() in artist_name or artist_name in artist.lower()):
+            return result
+
+    # If no exact match, use the first result
+    if hits:
+        return hits[0].get('result', {})
+    return None
 
 def scrape_genius_lyrics(song_url):
     """Scrape lyrics from Genius song page"""
@@ -207,78 +594,188 @@ def scrape_genius_lyrics(song_url):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
-        response = requests.get(song_url, headers=headers, timeout=10)
-        response.raise_for_status()
+        # Closing the streamed response frees its slot on the host even if parsing stops early
+        with http_client.get(song_url, headers=headers, timeout=10, stream=True) as response:
+            response.raise_for_status()
+
+            # Stream the page and keep only the data-lyrics-container text
+            raw_chunks = []
+            lyrics_text = extract_lyrics_containers(decode_page_chunks(response, raw_chunks))
+
+        if lyrics_text is None:
+            # No lyrics containers: fall back to the class name selectors
+            lyrics_text = extract_lyrics_with_soup(b''.join(raw_chunks))
+
+        if lyrics_text:
+            return clean_scraped_lyrics(lyrics_text)
+
+        return None
+
+    except Exception as e:
+        print(f"Error scraping lyrics: {e}")
+        return None
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+def decode_page_chunks(response, raw_chunks):
+    """Decode a streamed response as text, keeping the raw bytes for the fallback parser"""
+    content_type = response.headers.get('Content-Type', '').lower()
+    encoding = response.encoding if 'charset' in content_type and response.encoding else 'utf-8'
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
 
-        # Find lyrics container (Genius uses different class names that change)
-        lyrics_divs = soup.find_all('div', {'data-lyrics-container': 'true'})
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        raw_chunks.append(chunk)
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
 
-        if not lyrics_divs:
-            # Try alternative selectors
-            lyrics_divs = soup.find_all('div', class_=lambda x: x and 'lyrics' in x.lower())
+def extract_lyrics_with_soup(content):
+    """Find lyrics divs with BeautifulSoup selectors, returning their text or None"""
+    soup = BeautifulSoup(content, 'html.parser')
 
-        if not lyrics_divs:
-            # Try more specific patterns
-            lyrics_divs = soup.find_all('div', class_=lambda x: x and ('Lyrics__Container' in str(x)))
+    # Find lyrics container (Genius uses different class names that change)
+    lyrics_divs = soup.find_all('div', {'data-lyrics-container': 'true'})
 
-        if lyrics_divs:
-            lyrics_text = ''
-            for div in lyrics_divs:
-                # Remove unwanted elements
-                for unwanted in div.find_all(['script', 'style', 'div'], class_=lambda x: x and 'ad' in str(x).lower()):
-                    unwanted.decompose()
+    if not lyrics_divs:
+        # Try alternative selectors
+        lyrics_divs = soup.find_all('div', class_=lambda x: x and 'lyrics' in x.lower())
+
+    if not lyrics_divs:
+        # Try more specific patterns
+        lyrics_divs = soup.find_all('div', class_=lambda x: x and ('Lyrics__Container' in str(x)))
+
+    if not lyrics_divs:
+        return None
 
-                text = div.get_text(separator='\n', strip=True)
-                lyrics_text += text + '\n'
+    lyrics_text = ''
+    for div in lyrics_divs:
+        # Remove unwanted elements
+        for unwanted in div.find_all(['script', 'style', 'div'], class_=lambda x: x and 'ad' in str(x).lower()):
+            unwanted.decompose()
 
-            # Clean up the lyrics
-            lyrics_text = lyrics_text.strip()
+        text = div.get_text(separator='\n', strip=True)
+        lyrics_text += text + '\n'
 
-            # Remove common artifacts
-            lines = lyrics_text.split('\n')
-            cleaned_lines = []
+    return lyrics_text
 
-            for line in lines:
-                line = line.strip()
-                # Skip empty lines and common artifacts
-                if line and not line.startswith('[') and not line.endswith(']'):
-                    # Remove section headers like [Verse 1], [Chorus], etc.
-                    if not (line.startswith('[') and line.endswith(']')):
-                        cleaned_lines.append(line)
+def clean_scraped_lyrics(lyrics_text):
+    """Strip section headers and blank lines from scraped lyrics, or None if nothing is left"""
+    # Clean up the lyrics
+    lyrics_text = lyrics_text.strip()
 
-            if cleaned_lines:
-                return '\n'.join(cleaned_lines)
+    # Remove common artifacts
+    lines = lyrics_text.split('\n')
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+        # Skip empty lines and common artifacts
+        if line and not line.startswith('[') and not line.endswith(']'):
+            # Remove section headers like [Verse 1], [Chorus], etc.
+            if not (line.startswith('[') and line.endswith(']')):
+                cleaned_lines.append(line)
+
+    if cleaned_lines:
+        return '\n'.join(cleaned_lines)
+
+    return None
+
+def load_phonetic_store():
+    """Open the prebuilt pronunciation index (python phonetic_store.py), or None to use pronouncing"""
+    path = os.getenv('PHONETIC_STORE_PATH', str(DEFAULT_STORE_PATH))
+    if not path:
+        return None
 
+    if not os.path.exists(path):
+        print(f"⚠ Warning: No phonetic store at {path}. Run 'python phonetic_store.py' for faster startup.")
         return None
 
+    try:
+        store = PhoneticStore.open(path)
+        print(f"✓ Phonetic store loaded ({len(store)} words)")
+        return store
     except Exception as e:
-        print(f"Error scraping lyrics: {e}")
+        print(f"⚠ Warning: Failed to load phonetic store at {path}: {e}")
         return None
 
-def clean_word(word):
-    """Remove punctuation and convert to lowercase"""
-    if ' ' in word:
-        parts = word.strip().split()
-        if len(parts) >= 2:
-            word = parts[-1]  # Take the last word for phrases
+phonetic_store = load_phonetic_store()
+
+if phonetic_store is None:
+    # Only needed without the store; importing it costs ~10MB per process
+    import pronouncing
 
-    if '-' in word:
-        parts = word.split('-')
-        if len(parts) == 2 and parts[1]:
-            word = parts[1]  # Take part after hyphen
+def dictionary_phones(word):
+    """All CMU pronunciations for a word, from the phonetic store when it is loaded"""
+    if phonetic_store is not None:
+        return phonetic_store.phones_for_word(word)
+    return pronouncing.phones_for_word(word)
+
+def build_rhyme_index():
+    """Build a rhyming part -> words index over the whole CMU dictionary"""
+    import pronouncing  # Not imported at module level when the phonetic store is loaded
+    pronouncing.init_cmu()
+    return {
+        rhyme_part: frozenset(words)
+        for rhyme_part, words in pronouncing.rhyme_lookup.items()
+    }
 
-    return re.sub(r'[^\w]', '', word.lower())
+# Without a phonetic store, built once at startup so exact rhyme checks are a dict hit
+RHYME_INDEX = build_rhyme_index() if phonetic_store is None else None
+
+def exact_rhymes_for_phones(phones):
+    """Get every dictionary word sharing the rhyming part of a pronunciation"""
+    if not phones:
+        return frozenset()
+    return rhyming_words(get_rhyming_part(phones))
+
+# Hyphens, dashes, slashes and spaces split compounds like "bench-pressed" or "key west"
+COMPOUND_SEPARATORS = re.compile(r'[-\u2010-\u2014/\s]+')
+
+def compound_parts(word):
+    """Split a token into its cleaned compound parts (one part for ordinary words)"""
+    parts = (re.sub(r'[^\w]', '', part.lower()) for part in COMPOUND_SEPARATORS.split(word))
+    return [part for part in parts if part]
+
+def clean_word(word):
+    """Remove punctuation and convert to lowercase, joining the parts of compounds"""
+    return ''.join(compound_parts(word))
+
+# Per-process similarity caches, bounded so long-running workers don't grow without limit
+SIMILARITY_CACHE_SIZE = int(os.getenv('SIMILARITY_CACHE_SIZE', '200000'))
+RHYMING_PART_CACHE_SIZE = int(os.getenv('RHYMING_PART_CACHE_SIZE', '50000'))
+
+@lru_cache(maxsize=RHYMING_PART_CACHE_SIZE)
+def get_rhyming_part(phones):
+    """Memoized pronouncing.rhyming_part"""
+    return rhyming_part(phones)
+
+@lru_cache(maxsize=RHYMING_PART_CACHE_SIZE)
+def rhyming_words(rhyme_part):
+    """Every dictionary word with a pronunciation ending in this rhyming part (memoized)"""
+    if phonetic_store is not None:
+        # A view over the mapped store, so no worker builds its own copy of the word list
+        return phonetic_store.rhyme_set(rhyme_part)
+    return RHYME_INDEX.get(rhyme_part, frozenset())
+
+@lru_cache(maxsize=RHYMING_PART_CACHE_SIZE)
+def rhyme_phonemes(phones):
+    """Split the rhyming part of a pronunciation into phonemes (memoized)"""
+    return tuple(get_rhyming_part(phones).split())
 
 def phonetic_similarity(phones1, phones2, threshold=0.7):
     """Enhanced phonetic similarity with better rhyme accuracy"""
     if not phones1 or not phones2:
         return 0.0
 
+    # The score is symmetric, so order the pair to share a single cache entry
+    if phones2 < phones1:
+        phones1, phones2 = phones2, phones1
+
+    return cached_phonetic_similarity(phones1, phones2)
+
+@lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def cached_phonetic_similarity(phones1, phones2):
+    """Score a pair of phone strings, memoized by the pair"""
     # Get rhyming parts (suffix similarity is most important for rhymes)
-    rhyme1 = pronouncing.rhyming_part(phones1)
-    rhyme2 = pronouncing.rhyming_part(phones2)
+    rhyme1 = get_rhyming_part(phones1)
+    rhyme2 = get_rhyming_part(phones2)
 
     if not rhyme1 or not rhyme2:
         return 0.0
@@ -287,28 +784,128 @@ def phonetic_similarity(phones1, phones2, threshold=0.7):
     if rhyme1 == rhyme2:
         return 1.0
 
-    # Split into phonemes
-    phonemes1 = rhyme1.split()
-    phonemes2 = rhyme2.split()
+    # Encoded phonemes (converted once per pronunciation)
+    encoded1 = encode_rhyme(phones1)
+    encoded2 = encode_rhyme(phones2)
 
-    if len(phonemes1) == 0 or len(phonemes2) == 0:
+    if not encoded1.codes or not encoded2.codes:
         return 0.0
 
     # Enhanced similarity calculation
-    return calculate_enhanced_phonetic_similarity(phonemes1, phonemes2)
+    return encoded_phonetic_similarity(encoded1, encoded2)
+
+def similarity_cache_stats():
+    """Hit/miss counters for the similarity and rhyming part caches"""
+    stats = {}
+    for name, cached in (('phonetic_similarity', cached_phonetic_similarity),
+                         ('rhyming_part', get_rhyming_part),
+                         ('rhyming_words', rhyming_words),
+                         ('rhyme_phonemes', rhyme_phonemes),
+                         ('encoded_rhymes', encode_rhyme),
+                         ('letter_to_sound', guess_phones),
+                         ('compounds', compound_phones)):
+        info = cached.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'max_size': info.maxsize,
+            'hit_rate': round(info.hits / lookups, 3) if lookups else 0.0
+        }
+    return stats
+
+# Vowel phonemes (including stressed and unstressed variants)
+VOWEL_PHONEMES = {'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW'}
+
+# Compact integer encoding for the similarity hot path. Every distinct phoneme
+# token (stress digit included) gets a small integer code once, with its vowel
+# id precomputed, so scoring never re-parses phoneme strings. Stress needs no
+# table of its own: it only matters through token equality, and tokens that
+# differ in stress get different codes.
+PHONEME_CODES = {}        # token -> code
+PHONEME_VOWEL_IDS = []    # code -> vowel id, or -1 for consonants
+VOWEL_IDS = {}            # vowel sound without stress -> vowel id
+VOWEL_SOUNDS = []         # vowel id -> vowel sound
+SIMILAR_VOWEL_MASKS = []  # vowel id -> bitmask of slant-rhyme vowel ids
+_phoneme_codes_lock = threading.Lock()
+
+# Full ARPAbet inventory, registered up front so codes are stable across processes
+ARPABET_VOWELS = ['AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW']
+ARPABET_CONSONANTS = [
+    'B', 'CH', 'D', 'DH', 'F', 'G', 'HH', 'JH', 'K', 'L', 'M', 'N', 'NG', 'P', 'R',
+    'S', 'SH', 'T', 'TH', 'V', 'W', 'Y', 'Z', 'ZH'
+]
+
+EncodedRhyme = namedtuple('EncodedRhyme', ['codes', 'last_vowel_pos', 'last_vowel'])
+
+def _register_vowel(sound):
+    """Assign a vowel id and update the slant-rhyme masks (caller holds the lock)"""
+    vowel_id = len(VOWEL_SOUNDS)
+    VOWEL_IDS[sound] = vowel_id
+    VOWEL_SOUNDS.append(sound)
+    SIMILAR_VOWEL_MASKS.append(0)
+
+    for other_id, other in enumerate(VOWEL_SOUNDS):
+        if other_id != vowel_id and are_similar_vowels(sound, other):
+            SIMILAR_VOWEL_MASKS[vowel_id] |= 1 << other_id
+            SIMILAR_VOWEL_MASKS[other_id] |= 1 << vowel_id
+    return vowel_id
+
+def phoneme_code(token):
+    """Get the integer code for a phoneme token, registering it on first sight"""
+    code = PHONEME_CODES.get(token)
+    if code is not None:
+        return code
+
+    with _phoneme_codes_lock:
+        code = PHONEME_CODES.get(token)
+        if code is not None:
+            return code
+
+        code = len(PHONEME_VOWEL_IDS)
+        if code > 255:
+            raise ValueError(f'Too many distinct phonemes to encode: {token}')
+
+        vowel_id = -1
+        if any(token.startswith(v) for v in VOWEL_PHONEMES):
+            sound = ''.join(c for c in token if c.isalpha())
+            vowel_id = VOWEL_IDS[sound] if sound in VOWEL_IDS else _register_vowel(sound)
+
+        PHONEME_VOWEL_IDS.append(vowel_id)
+        PHONEME_CODES[token] = code
+        return code
+
+def encode_phonemes(phonemes):
+    """Convert a phoneme list into codes plus the position and id of its last vowel"""
+    codes = bytes(phoneme_code(p) for p in phonemes)
+
+    last_vowel_pos = -1
+    last_vowel = -1
+    for i in range(len(codes) - 1, -1, -1):
+        if PHONEME_VOWEL_IDS[codes[i]] >= 0:
+            last_vowel_pos = i
+            last_vowel = PHONEME_VOWEL_IDS[codes[i]]
+            break
+
+    return EncodedRhyme(codes, last_vowel_pos, last_vowel)
+
+@lru_cache(maxsize=RHYMING_PART_CACHE_SIZE)
+def encode_rhyme(phones):
+    """Encode the rhyming part of a pronunciation (memoized)"""
+    return encode_phonemes(rhyme_phonemes(phones))
 
 def calculate_enhanced_phonetic_similarity(phonemes1, phonemes2):
     """More sophisticated phonetic similarity calculation"""
+    return encoded_phonetic_similarity(encode_phonemes(phonemes1), encode_phonemes(phonemes2))
 
-    # Vowel phonemes (including stressed and unstressed variants)
-    vowels = {'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW'}
-
-    # Extract vowel sounds and their positions
-    vowels1 = [(i, p) for i, p in enumerate(phonemes1) if any(p.startswith(v) for v in vowels)]
-    vowels2 = [(i, p) for i, p in enumerate(phonemes2) if any(p.startswith(v) for v in vowels)]
+def encoded_phonetic_similarity(rhyme1, rhyme2):
+    """Score two encoded rhyming parts without building intermediate lists"""
+    codes1, last_vowel_pos1, last_vowel1 = rhyme1
+    codes2, last_vowel_pos2, last_vowel2 = rhyme2
 
     # If no vowels, can't be a good rhyme
-    if not vowels1 or not vowels2:
+    if last_vowel_pos1 < 0 or last_vowel_pos2 < 0:
         return 0.0
 
     # Score components
@@ -317,32 +914,24 @@ def calculate_enhanced_phonetic_similarity(phonemes1, phonemes2):
     ending_score = 0.0
 
     # 1. Vowel sound similarity (most important for rhymes)
-    last_vowel1 = vowels1[-1][1]  # Last vowel sound
-    last_vowel2 = vowels2[-1][1]
-
-    # Remove stress numbers for comparison
-    clean_vowel1 = ''.join(c for c in last_vowel1 if c.isalpha())
-    clean_vowel2 = ''.join(c for c in last_vowel2 if c.isalpha())
-
-    if clean_vowel1 == clean_vowel2:
+    if last_vowel1 == last_vowel2:
         vowel_score = 1.0
-    elif are_similar_vowels(clean_vowel1, clean_vowel2):
+    elif SIMILAR_VOWEL_MASKS[last_vowel1] >> last_vowel2 & 1:
         vowel_score = 0.7
     else:
         # If main vowel sounds don't match, it's not a good rhyme
         return 0.0
 
     # 2. Ending consonant similarity
-    min_len = min(len(phonemes1), len(phonemes2))
-    max_len = max(len(phonemes1), len(phonemes2))
+    len1 = len(codes1)
+    len2 = len(codes2)
+    min_len = min(len1, len2)
+    max_len = max(len1, len2)
 
     # Check how many phonemes match from the end
     matching_from_end = 0
-    for i in range(min_len):
-        if phonemes1[-(i+1)] == phonemes2[-(i+1)]:
-            matching_from_end += 1
-        else:
-            break
+    while matching_from_end < min_len and codes1[len1 - matching_from_end - 1] == codes2[len2 - matching_from_end - 1]:
+        matching_from_end += 1
 
     if matching_from_end >= 2:  # At least 2 phonemes match
         ending_score = matching_from_end / max_len
@@ -350,7 +939,7 @@ def calculate_enhanced_phonetic_similarity(phonemes1, phonemes2):
         ending_score = 0.5
 
     # 3. Consonant cluster similarity (for words ending in similar sounds)
-    consonant_score = calculate_consonant_similarity(phonemes1, phonemes2)
+    consonant_score = encoded_consonant_similarity(rhyme1, rhyme2)
 
     # 4. Apply penalties for length mismatches
     length_penalty = 1.0
@@ -378,39 +967,44 @@ def are_similar_vowels(vowel1, vowel2):
             return True
     return False
 
-def calculate_consonant_similarity(phonemes1, phonemes2):
-    """Calculate similarity of consonant patterns"""
-    # Focus on ending consonants after the main vowel
-    vowels = {'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW'}
+def register_arpabet_phonemes():
+    """Assign codes to every ARPAbet token before any scoring happens"""
+    for vowel in ARPABET_VOWELS:
+        for stress in '012':
+            phoneme_code(vowel + stress)
+    for consonant in ARPABET_CONSONANTS:
+        phoneme_code(consonant)
 
-    # Find last vowel position in each word
-    last_vowel_pos1 = -1
-    last_vowel_pos2 = -1
+register_arpabet_phonemes()
 
-    for i, p in enumerate(phonemes1):
-        if any(p.startswith(v) for v in vowels):
-            last_vowel_pos1 = i
+def calculate_consonant_similarity(phonemes1, phonemes2):
+    """Calculate similarity of consonant patterns"""
+    return encoded_consonant_similarity(encode_phonemes(phonemes1), encode_phonemes(phonemes2))
 
-    for i, p in enumerate(phonemes2):
-        if any(p.startswith(v) for v in vowels):
-            last_vowel_pos2 = i
+def encoded_consonant_similarity(rhyme1, rhyme2):
+    """Compare the consonants after the last vowel of two encoded rhyming parts"""
+    codes1, last_vowel_pos1, _ = rhyme1
+    codes2, last_vowel_pos2, _ = rhyme2
 
     if last_vowel_pos1 == -1 or last_vowel_pos2 == -1:
         return 0.0
 
-    # Get consonants after last vowel
-    consonants1 = phonemes1[last_vowel_pos1 + 1:]
-    consonants2 = phonemes2[last_vowel_pos2 + 1:]
+    # Count consonants after last vowel
+    tail1 = len(codes1) - last_vowel_pos1 - 1
+    tail2 = len(codes2) - last_vowel_pos2 - 1
 
-    if not consonants1 and not consonants2:
+    if not tail1 and not tail2:
         return 1.0  # Both end in vowels
 
-    if len(consonants1) == 0 or len(consonants2) == 0:
+    if tail1 == 0 or tail2 == 0:
         return 0.3  # One ends in vowel, one in consonant
 
     # Count matching consonants
-    matches = sum(1 for c1, c2 in zip(consonants1, consonants2) if c1 == c2)
-    max_consonants = max(len(consonants1), len(consonants2))
+    matches = 0
+    for offset in range(1, min(tail1, tail2) + 1):
+        if codes1[last_vowel_pos1 + offset] == codes2[last_vowel_pos2 + offset]:
+            matches += 1
+    max_consonants = max(tail1, tail2)
 
     return matches / max_consonants if max_consonants > 0 else 0.0
 
@@ -453,8 +1047,12 @@ def calculate_rhyme_score(text, rhyme_groups, threshold):
                 # Check against first word in group for quality assessment
                 first_word = group['words'][0]
                 if word != first_word['clean']:
-                    exact_rhymes = pronouncing.rhymes(first_word['clean'])
-                    if word in exact_rhymes:
+                    # Grouping records how each member matched; fall back to the rhyme index otherwise
+                    match = word_obj.get('match')
+                    if match is None:
+                        match = 'exact' if word in exact_rhymes_for_phones(first_word.get('phones')) else 'similar'
+
+                    if match == 'exact':
                         perfect_rhymes += 1
                     else:
                         slant_rhymes += 1
@@ -550,107 +1148,430 @@ def get_optimal_color(used_colors, available_colors):
     # Fallback to cycling if we've used all unique colors
     return available_colors[len(used_colors) % len(available_colors)]
 
-def find_all_rhymes(text, threshold=0.7):
-    """Enhanced rhyme detection with phonetic similarity"""
-    lines = text.split('\n')
-    all_words = []
-
-    # Step 1: Extract all words with positions and phonetic data
-    for line_idx, line in enumerate(lines):
-        words = line.split()
-        for word_idx, word in enumerate(words):
-            clean = clean_word(word)
-            if len(clean) >= 2:
-                phones = pronouncing.phones_for_word(clean)
-                all_words.append({
-                    'original': word,
-                    'clean': clean,
-                    'line_index': line_idx,
-                    'word_index': word_idx,
-                    'phones': phones[0] if phones else None
-                })
+def last_vowel_sound(phones):
+    """Get the last vowel of a pronunciation's rhyming part without stress markers"""
+    if not phones:
+        return None
 
-    # Step 2: Find rhyme groups using enhanced detection
-    rhyme_groups = []
+    last_vowel = encode_rhyme(phones).last_vowel
+    return VOWEL_SOUNDS[last_vowel] if last_vowel >= 0 else None
+
+# Vowels whose words can score above zero against each other (same or slant vowel)
+COMPATIBLE_VOWELS = {
+    vowel: {other for other in VOWEL_PHONEMES if other == vowel or are_similar_vowels(vowel, other)}
+    for vowel in VOWEL_PHONEMES
+}
+
+# Highest score a slant-vowel pair can reach (perfect ending and consonants)
+MAX_SLANT_VOWEL_SCORE = 0.7 * 0.5 + 1.0 * 0.3 + 1.0 * 0.2
+
+def word_key(word_obj):
+    """Distinct-word key of a word record: its clean word, or its parts for a compound"""
+    return phones_lookup_key(word_obj['original'], word_obj['clean'])
+
+def word_occurrences(all_words):
+    """Map each distinct word key with phones to its positions, in first-seen order"""
+    # Every occurrence of a key has the same phones, so grouping works per distinct word
+    # ("co-op" and "coop" share a clean word but are pronounced differently)
+    occurrences = {}
+    for position, word_obj in enumerate(all_words):
+        if word_obj['phones']:
+            occurrences.setdefault(word_key(word_obj), []).append(position)
+    return occurrences
+
+def group_rhyme_words(all_words, threshold=0.7):
+    """Yield rhyme groups, scoring only pairs that share a rhyme or vowel bucket
+
+    Gives the same groups as comparing every word with every other word:
+    heads are taken in text order, and a word joins the head's group when it
+    is an exact rhyme or scores at least the threshold. Similarity is zero
+    unless the last vowels match or are slant vowels, so only words in the
+    head's rhyming-part bucket and compatible vowel buckets are scored.
+    """
+    occurrences = word_occurrences(all_words)
+    rhyme_buckets, vowel_buckets = word_buckets(all_words, occurrences)
+
+    order = {key: rank for rank, key in enumerate(occurrences)}
     used_words = set()
-    group_counter = 0
-
-    # High-contrast color palette with maximum visual separation
-    base_colors = [
-        '#C0392B',  # Deep Red
-        '#138D75',  # Teal
-        '#F39C12',  # Orange
-        '#8E44AD',  # Purple
-        '#27AE60',  # Green
-        '#1F618D',  # Blue
-        '#E67E22',  # Dark Orange
-        '#9B59B6',  # Light Purple
-        '#229954',  # Dark Green
-        '#2980B9',  # Light Blue
-        '#DC3545',  # Bright Red
-        '#17A2B8',  # Cyan
-        '#28A745',  # Bright Green
-        '#FFC107',  # Yellow
-        '#6F42C1',  # Indigo
-        '#CB4335',  # Burgundy
-        '#16A085',  # Dark Teal
-        '#E74C3C'   # Crimson
-    ]
+    pairs_compared = 0
 
-    used_colors = []
+    for key, positions in occurrences.items():
+        if key in used_words:
+            continue
 
-    for word_obj in all_words:
-        if word_obj['clean'] in used_words or not word_obj['phones']:
+        head = all_words[positions[0]]
+        head_rhyme = get_rhyming_part(head['phones'])
+        rhyming_words = exact_rhymes_for_phones(head['phones'])
+
+        if threshold <= 0:
+            # Zero-scoring pairs still pass, so every word is a candidate
+            candidates = set(occurrences)
+        else:
+            candidates = set(rhyme_buckets.get(head_rhyme, ()))
+            head_vowel = last_vowel_sound(head['phones'])
+            if threshold > MAX_SLANT_VOWEL_SCORE:
+                candidates.update(vowel_buckets.get(head_vowel, ()))
+            else:
+                for vowel in COMPATIBLE_VOWELS.get(head_vowel, ()):
+                    candidates.update(vowel_buckets.get(vowel, ()))
+
+        candidates.discard(key)
+        candidates.difference_update(used_words)
+
+        pairs_compared += len(candidates)
+        matched = {}
+        for other in sorted(candidates, key=order.__getitem__):
+            other_phones = all_words[occurrences[other][0]]['phones']
+            # Check exact rhymes first (guessed pronunciations aren't in the index), then
+            # phonetic similarity for slant rhymes
+            if other in rhyming_words or get_rhyming_part(other_phones) == head_rhyme:
+                matched[other] = 'exact'
+            elif phonetic_similarity(head['phones'], other_phones) >= threshold:
+                matched[other] = 'similar'
+
+        # Only create group if we have at least 2 words
+        if not matched:
             continue
 
-        # Find exact rhymes first
-        rhyming_words = pronouncing.rhymes(word_obj['clean'])
+        used_words.add(key)
+        used_words.update(matched)
+
+        yield [head] + group_members(all_words, occurrences, matched)
+
+    metrics.count('rhyme_pairs_compared_total', pairs_compared)
+
+def word_buckets(all_words, occurrences):
+    """Distinct words by each of their rhyming parts, and by the last vowel of their pronunciation"""
+    rhyme_buckets = {}
+    vowel_buckets = {}
+    for key, positions in occurrences.items():
+        phones = all_words[positions[0]]['phones']
+        rhyme_parts = {get_rhyming_part(p) for p in dictionary_phones(key)}
+        rhyme_parts.add(get_rhyming_part(phones))
+        for rhyme_part in rhyme_parts:
+            rhyme_buckets.setdefault(rhyme_part, []).append(key)
+        vowel_buckets.setdefault(last_vowel_sound(phones), []).append(key)
+    return rhyme_buckets, vowel_buckets
+
+# Lowest threshold the sensitivity slider reaches (100%)
+MIN_SLIDER_THRESHOLD = sensitivity_to_threshold(100)
+
+class RhymeEdges:
+    """Every pair of a document's words scoring at least min_threshold, scored once for all thresholds
+
+    Each distinct word keeps the words it could group with, best score first
+    and exact rhymes ahead of everything. Grouping at a threshold then takes
+    a prefix of each head's list instead of scoring pairs, and gives the
+    same groups as group_rhyme_words for any threshold >= min_threshold.
+    """
+
+    def __init__(self, all_words, min_threshold=MIN_SLIDER_THRESHOLD):
+        if min_threshold <= 0:
+            raise ValueError('min_threshold must be positive')
+
+        self.all_words = all_words
+        self.min_threshold = min_threshold
+        self.occurrences = occurrences = word_occurrences(all_words)
+        vocabulary = list(occurrences)
+        head_rhyme, incidence = rhyme_incidence(all_words, occurrences)
+
+        # Scored a block of rows at a time with the vectorized matrix, keeping only qualifying pairs
+        self.edges = {}  # word key -> (negated scores ascending, words in the same order)
+        for rows, block in similarity_blocks(all_words, occurrences):
+            exact = incidence[:, head_rhyme[rows]].T
+            scores = np.where(exact, np.inf, block)
+            for offset, row in enumerate(scores):
+                head = rows.start + offset
+                others = np.flatnonzero(row >= min_threshold)
+                others = others[others != head]
+                order = np.argsort(-row[others], kind='stable')
+                self.edges[vocabulary[head]] = ((-row[others[order]]).tolist(),
+                                                [vocabulary[j] for j in others[order]])
+
+    def groups(self, threshold):
+        """Yield the rhyme groups group_rhyme_words finds at this threshold"""
+        if threshold < self.min_threshold:
+            raise ValueError(f'Pairs were only kept down to threshold {self.min_threshold}')
+
+        used_words = set()
+        pairs_compared = 0
+        for key, positions in self.occurrences.items():
+            if key in used_words:
+                continue
+
+            scores, others = self.edges[key]
+            count = bisect.bisect_right(scores, -threshold)
+            pairs_compared += count
+            matched = {other: 'exact' if score == -math.inf else 'similar'
+                       for score, other in zip(scores[:count], others[:count]) if other not in used_words}
+            if not matched:
+                continue
+
+            used_words.add(key)
+            used_words.update(matched)
+
+            yield [self.all_words[positions[0]]] + group_members(self.all_words, self.occurrences, matched)
+
+        metrics.count('rhyme_pairs_compared_total', pairs_compared)
+
+def group_members(all_words, occurrences, matched):
+    """Every occurrence of the matched words in text order, each tagged with how it matched the head"""
+    member_positions = sorted(p for other in matched for p in occurrences[other])
+    # Copies, so the tag never sticks to word records reused by later analyses
+    return [{**all_words[p], 'match': matched[word_key(all_words[p])]} for p in member_positions]
+
+# Guess pronunciations for words missing from CMU (set LETTER_TO_SOUND=0 to skip them instead)
+LETTER_TO_SOUND = os.getenv('LETTER_TO_SOUND', '1') != '0'
+LETTER_TO_SOUND_CACHE_SIZE = int(os.getenv('LETTER_TO_SOUND_CACHE_SIZE', '20000'))
+
+def lookup_phones(clean):
+    """Get the primary pronunciation for a clean word, or None if unknown"""
+    phones = dictionary_phones(clean)
+    if phones:
+        return phones[0]
+    return guess_phones(clean) if LETTER_TO_SOUND else None
+
+COMPOUND_CACHE_SIZE = int(os.getenv('COMPOUND_CACHE_SIZE', '20000'))
+
+def lookup_word_phones(word, clean):
+    """Get the pronunciation for a token, resolving compounds from their parts"""
+    parts = compound_parts(word)
+    if len(parts) > 1:
+        return compound_phones(tuple(parts))
+    return lookup_phones(clean)
+
+@lru_cache(maxsize=COMPOUND_CACHE_SIZE)
+def compound_phones(parts):
+    """Memoized pronunciation of a compound, from its parts' pronunciations joined
+
+    Parts known to the dictionary are preferred over CMU's own compound
+    entry, which puts secondary stress on the last part ("hardpressed" ends
+    EH2 S T) and so would stop it rhyming with the part alone ("dressed").
+    """
+    part_phones = [dictionary_phones(part) for part in parts]
+    if all(part_phones):
+        return join_pieces([phones[0] for phones in part_phones])
+
+    for candidate in ('-'.join(parts), ''.join(parts)):
+        phones = dictionary_phones(candidate)
+        if phones:
+            return phones[0]
+
+    part_phones = [lookup_phones(part) for part in parts]
+    if not all(part_phones):
+        return None
+    return join_pieces(part_phones)
 
-        # Find which of our words are in the rhyming list
-        group_words = [word_obj]  # Start with current word
+@lru_cache(maxsize=LETTER_TO_SOUND_CACHE_SIZE)
+def guess_phones(clean):
+    """Memoized letter-to-sound pronunciation for a word missing from CMU"""
+    return guess_pronunciation(clean, dictionary_phones)
 
-        for other_word_obj in all_words:
-            if (other_word_obj['clean'] != word_obj['clean'] and
-                other_word_obj['clean'] not in used_words and
-                other_word_obj['phones']):
+def extract_words(lines, phones_lookup=None):
+    """Extract all words with positions and phonetic data
 
-                # Check exact rhymes first
-                if other_word_obj['clean'] in rhyming_words:
-                    group_words.append(other_word_obj)
-                # Check phonetic similarity for slant rhymes
-                elif phonetic_similarity(word_obj['phones'], other_word_obj['phones']) >= threshold:
-                    group_words.append(other_word_obj)
+    phones_lookup is an optional dict shared between calls (e.g. across a
+    batch) so each distinct word is resolved only once.
+    """
+    all_words = []
 
-        # Only create group if we have at least 2 words
-        if len(group_words) >= 2:
-            # Get rhyming part for syllable highlighting
-            rhyme_part = pronouncing.rhyming_part(word_obj['phones'])
-
-            # Select optimal color with maximum contrast
-            optimal_color = get_optimal_color(used_colors, base_colors)
-            used_colors.append(optimal_color)
-
-            rhyme_groups.append({
-                'letter': chr(ord('A') + group_counter),
-                'color': optimal_color,
-                'words': group_words,
-                'syllable_info': {
-                    'rhyme_sound': rhyme_part,
-                    'pattern': 'end_rhyme'
-                }
-            })
+    with metrics.stage('extract_words'), metrics.accumulate('phone_lookup', 'rhyme_phone_lookups_total'):
+        for line_idx, line in enumerate(lines):
+            all_words.extend(extract_line_words(line, line_idx, phones_lookup))
+    metrics.count('rhyme_words_extracted_total', len(all_words))
+
+    return all_words
+
+def extract_line_words(line, line_idx, phones_lookup=None, min_length=2):
+    """Extract the word records for a single line"""
+    line_words = []
+
+    words = line.split()
+    for word_idx, word in enumerate(words):
+        clean = clean_word(word)
+        if len(clean) >= min_length:
+            line_words.append(word_record(word, clean, line_idx, word_idx, phones_lookup))
+
+    return line_words
 
-            # Mark all words in this group as used
-            for gw in group_words:
-                used_words.add(gw['clean'])
+def extract_end_word(line, line_idx, phones_lookup=None):
+    """The record extract_line_words would end the line with, without looking up the rest"""
+    words = line.split()
+    for word_idx in range(len(words) - 1, -1, -1):
+        clean = clean_word(words[word_idx])
+        if len(clean) >= 2:
+            return word_record(words[word_idx], clean, line_idx, word_idx, phones_lookup)
+    return None
+
+def word_record(word, clean, line_idx, word_idx, phones_lookup=None):
+    """Position and pronunciation record for one word"""
+    key = phones_lookup_key(word, clean) if phones_lookup is not None else None
+    if key is not None and key in phones_lookup:
+        phones = phones_lookup[key]
+    elif metrics.enabled:
+        start = time.perf_counter()
+        phones = lookup_word_phones(word, clean)
+        metrics.add_stage_time('phone_lookup', time.perf_counter() - start)
+    else:
+        phones = lookup_word_phones(word, clean)
+
+    if key is not None:
+        phones_lookup[key] = phones
+
+    return {
+        'original': word,
+        'clean': clean,
+        'line_index': line_idx,
+        'word_index': word_idx,
+        'phones': phones
+    }
 
-            group_counter += 1
+def phones_lookup_key(word, clean):
+    """Key of a token in a shared phones_lookup
+
+    Compounds are pronounced from their parts, so "co-op" and "coop" share a
+    clean word but not a pronunciation; they are keyed by their parts.
+    """
+    if COMPOUND_SEPARATORS.search(word):
+        parts = compound_parts(word)
+        if len(parts) > 1:
+            return '-'.join(parts)
+    return clean
+
+def find_all_rhymes(text, threshold=0.7, phones_lookup=None):
+    """Enhanced rhyme detection with phonetic similarity"""
+    lines = text.split('\n')
+
+    # Step 1: Extract all words with positions and phonetic data
+    all_words = extract_words(lines, phones_lookup)
+
+    # Step 2: Find rhyme groups using enhanced detection
+    return build_rhyme_analysis(text, lines, group_rhyme_words(all_words, threshold), threshold,
+                                scheme=rhyme_scheme(line_end_words(all_words, len(lines))))
+
+def find_rhyme_scheme(text, phones_lookup=None):
+    """Scheme labels for each line from its end word alone, without full-text grouping"""
+    lines = text.split('\n')
+    with metrics.accumulate('phone_lookup', 'rhyme_phone_lookups_total'):
+        end_words = [extract_end_word(line, line_idx, phones_lookup) for line_idx, line in enumerate(lines)]
+    return {
+        'lines': lines,
+        'scheme': rhyme_scheme(end_words),
+        'end_words': [word['original'] if word else None for word in end_words]
+    }
+
+def line_end_words(all_words, line_count):
+    """The last word record of each line, or None for lines without words"""
+    end_words = [None] * line_count
+    for word in all_words:
+        end_words[word['line_index']] = word
+    return end_words
+
+def rhyme_scheme(end_words):
+    """Label lines whose end words share a rhyming part alike (A, B, A, B...), in one pass
+
+    Any of an end word's dictionary pronunciations can match an earlier
+    line. End words with no pronunciation only match the same word, and
+    lines without words get None.
+    """
+    labels = {}  # rhyming part (or unknown word key) -> label
+    label_count = 0
+    scheme = []
+
+    for word in end_words:
+        if word is None:
+            scheme.append(None)
+            continue
+
+        if word['phones']:
+            keys = [get_rhyming_part(word['phones'])]
+            keys.extend(get_rhyming_part(phones) for phones in dictionary_phones(word_key(word)))
+        else:
+            keys = [word_key(word)]
+
+        label = next((labels[key] for key in keys if key in labels), None)
+        if label is None:
+            label = rhyme_label(label_count)
+            label_count += 1
+        for key in keys:
+            labels.setdefault(key, label)
+        scheme.append(label)
+
+    return scheme
+
+def rhyme_label(index):
+    """Letters for the index-th scheme line or group: A..Z, then AA, AB, ..."""
+    label = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord('A') + remainder) + label
+    return label
+
+def find_multisyllabic_rhymes(text, phones_lookup=None):
+    """Multi-word and internal rhyme chains over the whole text (see multisyllabic.py)"""
+    # One-letter words count here: "I" carries a vowel in many multis
+    words = [word for line_idx, line in enumerate(text.split('\n'))
+             for word in extract_line_words(line, line_idx, phones_lookup, min_length=1)]
+    return find_vowel_chains(words)
+
+# High-contrast color palette with maximum visual separation
+BASE_COLORS = [
+    '#C0392B',  # Deep Red
+    '#138D75',  # Teal
+    '#F39C12',  # Orange
+    '#8E44AD',  # Purple
+    '#27AE60',  # Green
+    '#1F618D',  # Blue
+    '#E67E22',  # Dark Orange
+    '#9B59B6',  # Light Purple
+    '#229954',  # Dark Green
+    '#2980B9',  # Light Blue
+    '#DC3545',  # Bright Red
+    '#17A2B8',  # Cyan
+    '#28A745',  # Bright Green
+    '#FFC107',  # Yellow
+    '#6F42C1',  # Indigo
+    '#CB4335',  # Burgundy
+    '#16A085',  # Dark Teal
+    '#E74C3C'   # Crimson
+]
+
+def label_rhyme_groups(grouped_words):
+    """Yield each group of words as a lettered, colored rhyme group as soon as it is found"""
+    used_colors = []
+
+    for group_counter, group_words in enumerate(grouped_words):
+        # Get rhyming part for syllable highlighting
+        rhyme_part = get_rhyming_part(group_words[0]['phones'])
+
+        # Select optimal color with maximum contrast
+        optimal_color = get_optimal_color(used_colors, BASE_COLORS)
+        used_colors.append(optimal_color)
+
+        yield {
+            'letter': rhyme_label(group_counter),
+            'color': optimal_color,
+            'words': group_words,
+            'syllable_info': {
+                'rhyme_sound': rhyme_part,
+                'pattern': 'end_rhyme'
+            }
+        }
+
+def build_rhyme_analysis(text, lines, grouped_words, threshold, breakdown_cache=None, scheme=None):
+    """Letter and color rhyme groups, then add highlights and scoring"""
+    metrics.count('rhyme_analyses_total')
+    with metrics.stage('grouping'):
+        rhyme_groups = list(label_rhyme_groups(grouped_words))
 
     # Step 3: Create syllable highlights for multisyllabic words
-    syllable_highlights = create_syllable_highlights(rhyme_groups)
+    with metrics.stage('syllable_highlights'):
+        syllable_highlights = create_syllable_highlights(rhyme_groups, breakdown_cache)
 
     # Step 4: Calculate comprehensive scoring
-    score_data = calculate_rhyme_score(text, rhyme_groups, threshold)
+    with metrics.stage('scoring'):
+        score_data = calculate_rhyme_score(text, rhyme_groups, threshold)
 
     # Step 5: Format response for frontend
     rhyme_groups_dict = {}
@@ -661,12 +1582,331 @@ def find_all_rhymes(text, threshold=0.7):
         'lines': lines,
         'groups': rhyme_groups,
         'rhyme_groups': rhyme_groups_dict,
+        'scheme': scheme,
         'syllable_highlights': syllable_highlights,
         'score': score_data
     }
 
-def create_syllable_highlights(rhyme_groups):
-    """Create syllable-level highlighting for multisyllabic words"""
+class RhymeDocument:
+    """Per-session document state for incremental re-analysis
+
+    Each line's word records and the document's phone lookups are kept
+    between edits, so an edit only re-extracts the lines it changed.
+    Grouping still runs over the whole document, because greedy grouping
+    depends on the order words first appear and one new word can change
+    which head a later group forms around; it stays cheap because pair
+    scores come from the shared similarity cache. Syllable breakdowns are
+    memoized per document. Once the threshold changes (the sensitivity
+    slider), every pair is scored once into RhymeEdges, so further threshold
+    changes regroup without scoring until the text changes again.
+    """
+
+    def __init__(self, text, threshold=0.7):
+        self.lines = []
+        self.line_words = []     # word records per line, same order as lines
+        self.phones_lookup = {}
+        self.breakdown_cache = {}
+        self.threshold = threshold
+        self.version = 0
+        self.lock = threading.Lock()
+        self._analysis = None
+        self._edges = None
+        self._scheme = None
+        self.replace_text(text)
+        self.version = 0
+
+    def replace_text(self, text):
+        """Replace the whole document (used to create or resync a session)"""
+        if not isinstance(text, str):
+            raise ValueError('text must be a string')
+        self.apply_changes([{'start': 0, 'delete': len(self.lines), 'lines': text.split('\n')}])
+
+    def apply_changes(self, changes):
+        """Apply line edits in order; each replaces `delete` lines at `start` with `lines`
+
+        All changes are checked before any is applied, so a bad edit leaves
+        the document untouched. Empty changes leave the version and cached
+        analysis alone.
+        """
+        if not isinstance(changes, list):
+            raise ValueError('changes must be a list')
+
+        line_count = len(self.lines)
+        for change in changes:
+            start = change.get('start') if isinstance(change, dict) else None
+            delete = change.get('delete', 0) if isinstance(change, dict) else None
+            new_lines = change.get('lines', []) if isinstance(change, dict) else None
+
+            if not isinstance(start, int) or not isinstance(delete, int) or not isinstance(new_lines, list):
+                raise ValueError('Each change needs an integer start, integer delete and a list of lines')
+            if start < 0 or delete < 0 or start + delete > line_count:
+                raise ValueError(f'Change {start}+{delete} is outside the document ({line_count} lines)')
+            if not all(isinstance(line, str) and '\n' not in line for line in new_lines):
+                raise ValueError('Changed lines must be strings without newlines')
+            line_count += len(new_lines) - delete
+
+        # A change that deletes and inserts nothing (the UI's diff of unchanged text) is not an edit
+        changes = [change for change in changes if change.get('delete', 0) or change.get('lines')]
+        for change in changes:
+            start = change['start']
+            delete = change.get('delete', 0)
+            new_lines = change.get('lines', [])
+
+            self.lines[start:start + delete] = new_lines
+            with metrics.stage('extract_words'), metrics.accumulate('phone_lookup', 'rhyme_phone_lookups_total'):
+                self.line_words[start:start + delete] = [
+                    extract_line_words(line, start + offset, self.phones_lookup)
+                    for offset, line in enumerate(new_lines)
+                ]
+
+            # Lines after an insert or delete moved, so their records need new line indexes
+            if len(new_lines) != delete:
+                for line_idx in range(start + len(new_lines), len(self.lines)):
+                    for word in self.line_words[line_idx]:
+                        word['line_index'] = line_idx
+
+        if changes:
+            self.version += 1
+            self._analysis = None
+            self._edges = None
+            self._scheme = None
+
+    def set_threshold(self, threshold):
+        if threshold != self.threshold:
+            self.threshold = threshold
+            self._analysis = None
+            if self._edges is None and threshold >= MIN_SLIDER_THRESHOLD:
+                self._edges = RhymeEdges(self.all_words())
+
+    def all_words(self):
+        return [word for line_words in self.line_words for word in line_words]
+
+    def analyze(self):
+        """Same result as find_all_rhymes on the current text"""
+        if self._analysis is None:
+            if self._edges is not None and self.threshold >= self._edges.min_threshold:
+                grouped_words = self._edges.groups(self.threshold)
+            else:
+                grouped_words = group_rhyme_words(self.all_words(), self.threshold)
+
+            if self._scheme is None:
+                self._scheme = rhyme_scheme([line_words[-1] if line_words else None
+                                             for line_words in self.line_words])
+            self._analysis = build_rhyme_analysis('\n'.join(self.lines), list(self.lines), grouped_words,
+                                                  self.threshold, self.breakdown_cache,
+                                                  scheme=list(self._scheme))
+        return self._analysis
+
+class AnalysisSessions:
+    """Thread-safe store of editing sessions, expiring idle ones and the least recently used"""
+
+    def __init__(self, max_sessions=1000, ttl=1800):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()   # session id -> (document, last used)
+        self._lock = threading.Lock()
+
+    def create(self, text, threshold):
+        document = RhymeDocument(text, threshold)
+        session_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._sessions[session_id] = (document, time.monotonic())
+            self._evict()
+        return session_id, document
+
+    def get(self, session_id):
+        """Get a live session's document, or None if it is unknown or expired"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+
+            now = time.monotonic()
+            if now - entry[1] > self.ttl:
+                del self._sessions[session_id]
+                return None
+
+            self._sessions[session_id] = (entry[0], now)
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._sessions:
+            _, (_, last_used) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+analysis_sessions = AnalysisSessions(
+    max_sessions=int(os.getenv('MAX_ANALYSIS_SESSIONS', '1000')),
+    ttl=float(os.getenv('ANALYSIS_SESSION_TTL', '1800'))
+)
+
+# Rows scored per chunk when building a similarity matrix (bounds temporary memory)
+SIMILARITY_MATRIX_CHUNK_CELLS = 4_000_000
+
+def similarity_matrix(all_words):
+    """Score every pair of distinct words in one vectorized pass
+
+    Returns the distinct word keys (first-seen order) and an N x N matrix
+    holding the same values phonetic_similarity gives for each pair: vowel
+    match, shared suffix length, post-vowel consonant overlap and the length
+    penalty, all computed on the encoded rhyming parts.
+    """
+    occurrences = word_occurrences(all_words)
+    vocabulary = list(occurrences)
+    matrix = np.zeros((len(vocabulary), len(vocabulary)))
+    for rows, block in similarity_blocks(all_words, occurrences):
+        matrix[rows] = block
+    return vocabulary, matrix
+
+def similarity_blocks(all_words, occurrences):
+    """Yield (row slice, scores) blocks of the similarity matrix, rows in occurrences order"""
+    vocabulary = list(occurrences)
+    size = len(vocabulary)
+    if not size:
+        return
+
+    encoded = [encode_rhyme(all_words[occurrences[key][0]]['phones']) for key in vocabulary]
+
+    lengths = np.array([len(e.codes) for e in encoded])
+    last_vowel_pos = np.array([e.last_vowel_pos for e in encoded])
+    last_vowel = np.array([e.last_vowel for e in encoded])
+    tail_lengths = np.where(last_vowel_pos >= 0, lengths - last_vowel_pos - 1, 0)
+
+    # Rhyming parts reversed so column k is the k-th phoneme from the end; -1 pads
+    reversed_codes = np.full((size, max(lengths.max(), 1)), -1, dtype=np.int16)
+    tails = np.full((size, max(tail_lengths.max(), 1)), -1, dtype=np.int16)
+    rhyme_ids = {}
+    rhyme_id = np.empty(size, dtype=np.int64)
+    for i, e in enumerate(encoded):
+        codes = np.frombuffer(e.codes, dtype=np.uint8)
+        reversed_codes[i, :len(codes)] = codes[::-1]
+        if tail_lengths[i]:
+            tails[i, :tail_lengths[i]] = codes[e.last_vowel_pos + 1:]
+        rhyme_id[i] = rhyme_ids.setdefault(e.codes, len(rhyme_ids))
+
+    vowel_count = len(VOWEL_SOUNDS)
+    similar_vowels = np.array([[bool(SIMILAR_VOWEL_MASKS[a] >> b & 1) for b in range(vowel_count)]
+                               for a in range(vowel_count)])
+
+    chunk = max(1, SIMILARITY_MATRIX_CHUNK_CELLS // (size * reversed_codes.shape[1]))
+    for start in range(0, size, chunk):
+        rows = slice(start, min(start + chunk, size))
+
+        # 1. Vowel sound similarity (most important for rhymes)
+        vowel1 = last_vowel[rows, None]
+        vowel2 = last_vowel[None, :]
+        has_vowels = (vowel1 >= 0) & (vowel2 >= 0)
+        vowel_score = np.where(vowel1 == vowel2, 1.0,
+                               np.where(similar_vowels[np.maximum(vowel1, 0), np.maximum(vowel2, 0)], 0.7, 0.0))
+
+        # 2. Ending consonant similarity
+        min_len = np.minimum(lengths[rows, None], lengths[None, :])
+        max_len = np.maximum(lengths[rows, None], lengths[None, :])
+        same_from_end = reversed_codes[rows, None, :] == reversed_codes[None, :, :]
+        matching_from_end = np.minimum(np.cumprod(same_from_end, axis=2).sum(axis=2), min_len)
+        ending_score = np.where(matching_from_end >= 2, matching_from_end / max_len,
+                                np.where((matching_from_end == 1) & (min_len <= 2), 0.5, 0.0))
+
+        # 3. Consonant cluster similarity
+        tail1 = tail_lengths[rows, None]
+        tail2 = tail_lengths[None, :]
+        positions = np.arange(tails.shape[1])
+        in_both_tails = positions[None, None, :] < np.minimum(tail1, tail2)[:, :, None]
+        consonant_matches = ((tails[rows, None, :] == tails[None, :, :]) & in_both_tails).sum(axis=2)
+        consonant_score = np.where((tail1 == 0) & (tail2 == 0), 1.0,
+                                   np.where((tail1 == 0) | (tail2 == 0), 0.3,
+                                            consonant_matches / np.maximum(np.maximum(tail1, tail2), 1)))
+
+        # 4. Apply penalties for length mismatches
+        length_penalty = np.where(max_len > min_len * 2, 0.5, 1.0)
+
+        final_score = np.minimum((vowel_score * 0.5 + ending_score * 0.3 + consonant_score * 0.2) * length_penalty, 1.0)
+        final_score = np.where(has_vowels & (vowel_score > 0), final_score, 0.0)
+
+        # Exact rhyming-part matches always score 1.0
+        yield rows, np.where(rhyme_id[rows, None] == rhyme_id[None, :], 1.0, final_score)
+
+def group_by_similarity_matrix(all_words, threshold=0.7):
+    """Yield rhyme groups by thresholding the full similarity matrix
+
+    Same heads, members and order as group_rhyme_words; each head's members
+    are picked with one vectorized row operation instead of per-pair calls.
+    """
+    occurrences = word_occurrences(all_words)
+    vocabulary, matrix = similarity_matrix(all_words)
+    size = len(vocabulary)
+    if not size:
+        return
+
+    head_rhyme, incidence = rhyme_incidence(all_words, occurrences)
+    joins = (matrix >= threshold) | incidence[:, head_rhyme].T
+    np.fill_diagonal(joins, False)
+
+    used = np.zeros(size, dtype=bool)
+    unused_count = size
+    pairs_compared = 0
+    for head_index, key in enumerate(vocabulary):
+        if used[head_index]:
+            continue
+
+        pairs_compared += unused_count - 1
+        members = joins[head_index] & ~used
+        if not members.any():
+            continue
+
+        used[head_index] = True
+        used |= members
+        unused_count -= 1 + int(np.count_nonzero(members))
+
+        matched = {vocabulary[j]: 'exact' if incidence[j, head_rhyme[head_index]] else 'similar'
+                   for j in np.flatnonzero(members)}
+        yield [all_words[occurrences[key][0]]] + group_members(all_words, occurrences, matched)
+
+    metrics.count('rhyme_pairs_compared_total', pairs_compared)
+
+def rhyme_incidence(all_words, occurrences):
+    """Each word's rhyming part id, and incidence[j, k]: word j has a pronunciation with rhyming part k
+
+    Word j is an exact rhyme for head i when incidence[j, head_rhyme[i]].
+    """
+    rhyme_part_ids = {}
+    head_rhyme = np.empty(len(occurrences), dtype=np.int64)
+    member_rhymes = []
+    for i, (key, positions) in enumerate(occurrences.items()):
+        phones = all_words[positions[0]]['phones']
+        head_rhyme[i] = rhyme_part_ids.setdefault(get_rhyming_part(phones), len(rhyme_part_ids))
+        member_rhymes.append({rhyme_part_ids.setdefault(get_rhyming_part(p), len(rhyme_part_ids))
+                              for p in dictionary_phones(key) + [phones]})
+
+    incidence = np.zeros((len(occurrences), len(rhyme_part_ids)), dtype=bool)
+    for j, rhyme_ids in enumerate(member_rhymes):
+        incidence[j, list(rhyme_ids)] = True
+    return head_rhyme, incidence
+
+def find_all_rhymes_vectorized(text, threshold=0.7):
+    """find_all_rhymes for bulk jobs, grouping from a NumPy similarity matrix"""
+    lines = text.split('\n')
+    all_words = extract_words(lines)
+    return build_rhyme_analysis(text, lines, group_by_similarity_matrix(all_words, threshold), threshold,
+                                scheme=rhyme_scheme(line_end_words(all_words, len(lines))))
+
+def create_syllable_highlights(rhyme_groups, breakdown_cache=None):
+    """Create syllable-level highlighting for multisyllabic words
+
+    breakdown_cache is an optional dict reused between calls (e.g. by an
+    editing session) so unchanged words are not broken down again.
+    """
     syllable_highlights = {}
 
     for group in rhyme_groups:
@@ -679,7 +1919,14 @@ def create_syllable_highlights(rhyme_groups):
             original_word = word_obj['original']
 
             # Create syllable breakdown for highlighting
-            syllables = create_syllable_breakdown(original_word, clean_word, rhyme_part, group_color)
+            if breakdown_cache is None:
+                syllables = create_syllable_breakdown(original_word, clean_word, rhyme_part, group_color)
+            else:
+                key = (original_word, rhyme_part, group_color)
+                syllables = breakdown_cache.get(key)
+                if syllables is None:
+                    syllables = breakdown_cache[key] = create_syllable_breakdown(
+                        original_word, clean_word, rhyme_part, group_color)
 
             syllable_highlights[word_key] = {
                 'word': original_word,
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Scaling benchmark for the bucketed rhyme grouping engine
+
+Times group_rhyme_words on synthetic lyrics from 100 to 50k words and, for
+sizes small enough to finish, compares it against the old pairwise loop.
+
+    python benchmark_grouping.py
+    python benchmark_grouping.py --sizes 100 1000 10000 --threshold 0.58
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pronouncing
+from app import extract_words, group_rhyme_words, phonetic_similarity
+
+DEFAULT_SIZES = [100, 500, 1000, 5000, 10000, 50000]
+
+def synthetic_lyrics(word_count, vocabulary_size=5000, words_per_line=8, seed=27):
+    """Build lyrics with a Zipf-like word distribution over a fixed CMU vocabulary"""
+    rng = random.Random(seed)
+    pronouncing.init_cmu()
+    dictionary = sorted({word for word, _ in pronouncing.pronunciations if word.isalpha() and len(word) >= 2})
+    vocabulary = rng.sample(dictionary, vocabulary_size)
+    weights = [1.0 / rank for rank in range(1, vocabulary_size + 1)]
+
+    words = rng.choices(vocabulary, weights=weights, k=word_count)
+    lines = [' '.join(words[i:i + words_per_line]) for i in range(0, word_count, words_per_line)]
+    return '\n'.join(lines)
+
+def legacy_group_rhyme_words(all_words, threshold=0.7):
+    """The original pairwise loop, kept as a baseline for timing and correctness"""
+    used_words = set()
+    groups = []
+
+    for word_obj in all_words:
+        if word_obj['clean'] in used_words or not word_obj['phones']:
+            continue
+
+        rhyming_words = pronouncing.rhymes(word_obj['clean'])
+        group_words = [word_obj]
+
+        for other_word_obj in all_words:
+            if (other_word_obj['clean'] != word_obj['clean'] and
+                other_word_obj['clean'] not in used_words and
+                other_word_obj['phones']):
+
+                if other_word_obj['clean'] in rhyming_words:
+                    group_words.append(other_word_obj)
+                elif phonetic_similarity(word_obj['phones'], other_word_obj['phones']) >= threshold:
+                    group_words.append(other_word_obj)
+
+        if len(group_words) >= 2:
+            groups.append(group_words)
+            for gw in group_words:
+                used_words.add(gw['clean'])
+
+    return groups
+
+def group_keys(groups):
+    """Reduce groups to comparable word positions"""
+    return [[(w['line_index'], w['word_index']) for w in group] for group in groups]
+
+def run_benchmark(sizes, threshold, legacy_max):
+    print(f"{'words':>8} {'distinct':>9} {'groups':>7} {'bucketed':>10} {'pairwise':>10} {'speedup':>8}  match")
+
+    for size in sizes:
+        all_words = extract_words(synthetic_lyrics(size).split('\n'))
+        distinct = len({w['clean'] for w in all_words})
+
+        start = time.perf_counter()
+        groups = list(group_rhyme_words(all_words, threshold))
+        bucketed = time.perf_counter() - start
+
+        if size <= legacy_max:
+            start = time.perf_counter()
+            legacy_groups = legacy_group_rhyme_words(all_words, threshold)
+            pairwise = time.perf_counter() - start
+            match = 'yes' if group_keys(groups) == group_keys(legacy_groups) else 'NO'
+            print(f"{size:>8} {distinct:>9} {len(groups):>7} {bucketed:>9.3f}s {pairwise:>9.3f}s "
+                  f"{pairwise / max(bucketed, 1e-9):>7.1f}x  {match}")
+        else:
+            print(f"{size:>8} {distinct:>9} {len(groups):>7} {bucketed:>9.3f}s {'-':>10} {'-':>8}  -")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='word counts to benchmark')
+    parser.add_argument('--threshold', type=float, default=0.7,
+                        help='similarity threshold (0.7 is the 50%% sensitivity default)')
+    parser.add_argument('--legacy-max', type=int, default=5000,
+                        help='largest size to also run through the pairwise loop')
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.threshold, args.legacy_max)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare lyrics extraction paths on saved Genius pages
+
+For every HTML fixture, measures CPU time and peak traced memory per page
+for the full BeautifulSoup parse and for the streaming container
+extractor, and checks that both produce the same lyrics.
+
+    python benchmark_scraper.py
+    python benchmark_scraper.py --fixtures path/to/pages --repeat 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import extract_lyrics_with_soup, clean_scraped_lyrics
+from lyrics_extractor import extract_lyrics_containers
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'genius'
+CHUNK_SIZE = 64 * 1024
+
+def soup_path(content):
+    return extract_lyrics_with_soup(content)
+
+def streaming_path(content):
+    chunks = (content[i:i + CHUNK_SIZE].decode('utf-8', errors='replace')
+              for i in range(0, len(content), CHUNK_SIZE))
+    lyrics = extract_lyrics_containers(chunks)
+    # Pages without containers take the same fallback scrape_genius_lyrics uses
+    return lyrics if lyrics is not None else extract_lyrics_with_soup(content)
+
+def measure(extract, content, repeat):
+    """Median CPU seconds per page and peak traced bytes for one extraction"""
+    extract(content)  # warm up imports and caches
+
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        result = extract(content)
+        timings.append(time.process_time() - start)
+    cpu = statistics.median(timings)
+
+    tracemalloc.start()
+    extract(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, cpu, peak
+
+def run_benchmark(fixture_dir, repeat):
+    print(f"{'fixture':<24} {'size':>8} {'soup cpu':>10} {'fast cpu':>10} {'soup peak':>10} {'fast peak':>10}  same")
+
+    for path in sorted(Path(fixture_dir).glob('*.html')):
+        content = path.read_bytes()
+        soup_text, soup_cpu, soup_peak = measure(soup_path, content, repeat)
+        fast_text, fast_cpu, fast_peak = measure(streaming_path, content, repeat)
+        same = clean_scraped_lyrics(soup_text or '') == clean_scraped_lyrics(fast_text or '')
+
+        print(f"{path.name:<24} {len(content) // 1024:>6}KB {soup_cpu * 1000:>8.2f}ms {fast_cpu * 1000:>8.2f}ms "
+              f"{soup_peak // 1024:>8}KB {fast_peak // 1024:>8}KB  {'yes' if same else 'NO'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=str(FIXTURE_DIR), help='directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=20, help='extractions per page (median CPU time is reported)')
+    args = parser.parse_args()
+
+    run_benchmark(args.fixtures, args.repeat)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Reproducible speed and memory benchmarks for the rhyme analysis pipeline
+
+Times clean_word, phonetic_similarity, find_all_rhymes,
+calculate_rhyme_score and create_syllable_highlights on synthetic lyrics
+and on the lyrics of the saved Genius fixtures, each at increasing sizes.
+Each result has the median and best wall time over --repeat runs and the
+peak memory traced during one extra run. Results can be written as JSON
+and compared against an earlier run; the exit status is 1 if anything got
+slower than the tolerance allows.
+
+    python benchmark_suite.py
+    python benchmark_suite.py --output baseline.json
+    python benchmark_suite.py --baseline baseline.json --tolerance 1.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+from benchmark_grouping import synthetic_lyrics
+from lyrics_extractor import extract_lyrics_containers
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'genius'
+DEFAULT_SIZES = [100, 1000, 5000]
+SIMILARITY_CACHES = (app.cached_phonetic_similarity, app.get_rhyming_part, app.rhyme_phonemes, app.encode_rhyme)
+
+def fixture_lyrics(fixture_dir=FIXTURE_DIR):
+    """All lyrics from the saved Genius pages, joined into one text"""
+    songs = []
+    for path in sorted(Path(fixture_dir).glob('*.html')):
+        lyrics = extract_lyrics_containers([path.read_text(encoding='utf-8')])
+        if lyrics:
+            songs.append(app.clean_scraped_lyrics(lyrics))
+    return '\n'.join(songs)
+
+def repeat_to_size(text, word_count):
+    """Whole lines of text, cycled until the text has about word_count words"""
+    lines = [line for line in text.split('\n') if line.split()]
+    result = []
+    words = 0
+    while lines and words < word_count:
+        line = lines[len(result) % len(lines)]
+        result.append(line)
+        words += len(line.split())
+    return '\n'.join(result)
+
+def benchmark_cases(sizes, fixture_dir=FIXTURE_DIR):
+    """(case name, text) pairs, synthetic and fixture lyrics at each size"""
+    fixtures = fixture_lyrics(fixture_dir)
+    for size in sizes:
+        yield f'synthetic-{size}', synthetic_lyrics(size, vocabulary_size=min(5000, max(size // 2, 50)))
+        if fixtures:
+            yield f'fixture-{size}', repeat_to_size(fixtures, size)
+
+def pipeline_benchmarks(text, threshold):
+    """(function name, callable) for each pipeline step on one text, with inputs prepared up front"""
+    tokens = text.split()
+    all_words = app.extract_words(text.split('\n'))
+    phones = [w['phones'] for w in all_words if w['phones']]
+    pairs = list(zip(phones, phones[1:]))
+    analysis = app.find_all_rhymes(text, threshold)
+    groups = analysis['groups']
+
+    def similarity():
+        # Cold caches, so pairs are scored rather than looked up
+        clear_similarity_caches()
+        for phones1, phones2 in pairs:
+            app.phonetic_similarity(phones1, phones2)
+
+    def find_all_rhymes():
+        # Cold too: with warm caches every run after the first would only time cache hits
+        clear_similarity_caches()
+        app.find_all_rhymes(text, threshold)
+
+    return [
+        ('clean_word', lambda: [app.clean_word(token) for token in tokens]),
+        ('phonetic_similarity', similarity),
+        ('find_all_rhymes', find_all_rhymes),
+        ('calculate_rhyme_score', lambda: app.calculate_rhyme_score(text, groups, threshold)),
+        ('create_syllable_highlights', lambda: app.create_syllable_highlights(groups)),
+    ]
+
+def clear_similarity_caches():
+    for cached in SIMILARITY_CACHES:
+        cached.cache_clear()
+
+def measure(run, repeat):
+    """Median and best seconds over repeat runs, and peak traced bytes for one more"""
+    run()  # warm up lazy imports and caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), min(timings), peak
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=5, threshold=0.7, functions=None, fixture_dir=FIXTURE_DIR):
+    """Run every benchmark and return the results document"""
+    results = []
+    for case, text in benchmark_cases(sizes, fixture_dir):
+        words = len(text.split())
+        for name, run in pipeline_benchmarks(text, threshold):
+            if functions and name not in functions:
+                continue
+            median, best, peak = measure(run, repeat)
+            results.append({'name': name, 'case': case, 'words': words,
+                            'median_s': median, 'min_s': best, 'peak_bytes': peak})
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'phonetic_store': app.phonetic_store is not None,
+            'letter_to_sound': app.LETTER_TO_SOUND,
+            'repeat': repeat,
+            'threshold': threshold,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results
+    }
+
+def compare(results, baseline, tolerance=1.2):
+    """Pair each result with the baseline's; a regression is a median more than tolerance times slower"""
+    previous = {(r['name'], r['case']): r for r in baseline['results']}
+    comparisons = []
+    for result in results['results']:
+        before = previous.get((result['name'], result['case']))
+        if before is None:
+            continue
+        ratio = result['median_s'] / max(before['median_s'], 1e-9)
+        comparisons.append({**result, 'baseline_median_s': before['median_s'], 'ratio': ratio,
+                            'regressed': ratio > tolerance})
+    return comparisons
+
+def print_results(results, comparisons=None):
+    by_key = {(c['name'], c['case']): c for c in comparisons or []}
+    print(f"{'function':<28} {'case':<16} {'words':>6} {'median':>10} {'best':>10} {'peak':>9}"
+          + (f" {'baseline':>10} {'ratio':>6}" if comparisons is not None else ''))
+
+    for r in results['results']:
+        row = (f"{r['name']:<28} {r['case']:<16} {r['words']:>6} {r['median_s'] * 1000:>8.2f}ms "
+               f"{r['min_s'] * 1000:>8.2f}ms {r['peak_bytes'] // 1024:>7}KB")
+        c = by_key.get((r['name'], r['case']))
+        if c:
+            row += f" {c['baseline_median_s'] * 1000:>8.2f}ms {c['ratio']:>5.2f}x" + ('  SLOWER' if c['regressed'] else '')
+        print(row)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='word counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark (median is compared)')
+    parser.add_argument('--threshold', type=float, default=0.7, help='similarity threshold for the analysis')
+    parser.add_argument('--only', nargs='+', help='benchmark only these functions')
+    parser.add_argument('--fixtures', default=str(FIXTURE_DIR), help='directory of saved Genius .html pages')
+    parser.add_argument('--output', '-o', help='write results as JSON to this file')
+    parser.add_argument('--baseline', '-b', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.2,
+                        help='slowdown ratio (median vs baseline) reported as a regression')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.repeat, args.threshold, args.only, args.fixtures)
+
+    comparisons = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            comparisons = compare(results, json.load(f), args.tolerance)
+    print_results(results, comparisons)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Wrote {len(results['results'])} results to {args.output}")
+
+    if comparisons and any(c['regressed'] for c in comparisons):
+        print(f"⚠ Warning: {sum(c['regressed'] for c in comparisons)} benchmarks slower than {args.tolerance}x baseline")
+        sys.exit(1)
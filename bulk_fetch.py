@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Fetch lyrics for many artist/song pairs concurrently and analyze them as they arrive
+
+Lookups run the same search, best-match and scrape path as /search-lyrics
+(lookup_lyrics), bounded by a semaphore and a request rate limit. Cached
+songs skip the rate limit. Fetched lyrics go straight into a process pool
+running find_all_rhymes, and one JSON line is written per song as soon as
+its analysis finishes.
+
+Input is a CSV file of "artist,song" rows (an "artist,song" header is
+skipped) or a JSONL file of {"artist", "song"} objects.
+
+    python bulk_fetch.py pairs.csv > corpus.jsonl
+    python bulk_fetch.py pairs.jsonl --concurrency 16 --rate 8 --workers 4
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# app prints Genius setup status on import; keep stdout clean for the JSONL stream
+with contextlib.redirect_stdout(sys.stderr):
+    import app
+from analyze_corpus import analyze_song, init_worker
+
+class RateLimiter:
+    """Space request starts at least 1/rate seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+
+        if start > now:
+            await asyncio.sleep(start - now)
+
+def read_pairs(path):
+    """Yield (artist, song) pairs from a CSV or JSONL file"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record['artist'], record['song']
+            return
+
+        for row in csv.reader(f):
+            if len(row) < 2 or [c.strip().lower() for c in row[:2]] == ['artist', 'song']:
+                continue
+            yield row[0].strip(), row[1].strip()
+
+async def fetch_lyrics_bulk(pairs, concurrency=8, rate=5.0):
+    """Yield {query, status, ...lookup payload} as each lookup finishes"""
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    async def fetch(artist, song):
+        # SQLite reads block, so even cache hits run off the event loop
+        cached = await asyncio.to_thread(app.lyrics_cache.get, artist, song) if app.lyrics_cache else None
+        if cached:
+            return {'query': {'artist': artist, 'song': song}, 'status': 200, **cached, 'cached': True}
+
+        async with semaphore:
+            await limiter.wait()
+            payload, status = await asyncio.to_thread(app.lookup_lyrics, artist, song)
+        return {'query': {'artist': artist, 'song': song}, 'status': status, **payload}
+
+    # Keep a bounded window of lookups in flight rather than one task per pair up front
+    pending = set()
+    for artist, song in pairs:
+        pending.add(asyncio.ensure_future(fetch(artist, song)))
+        if len(pending) >= concurrency * 4:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    for task in asyncio.as_completed(pending):
+        yield await task
+
+async def fetch_and_analyze(pairs, sensitivity=70, concurrency=8, rate=5.0, workers=None, full=False):
+    """Yield fetched songs with their rhyme analysis, analyzing each as its lyrics arrive"""
+    loop = asyncio.get_running_loop()
+
+    # Spawned, not forked: this process already runs an event loop, lookup threads and a SQLite connection
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+        analyses = set()
+
+        async def analyze(fetched):
+            query = fetched['query']
+            task = (f"{query['artist']} - {query['song']}", fetched['lyrics'], sensitivity, full)
+            result = await loop.run_in_executor(pool, analyze_song, task)
+            result.pop('id', None)
+            return {**fetched, 'analysis': result}
+
+        async for fetched in fetch_lyrics_bulk(pairs, concurrency, rate):
+            if fetched.get('success') and fetched.get('lyrics'):
+                analyses.add(asyncio.ensure_future(analyze(fetched)))
+            else:
+                yield fetched
+
+            finished = {task for task in analyses if task.done()}
+            analyses -= finished
+            for task in finished:
+                yield task.result()
+
+        for task in asyncio.as_completed(analyses):
+            yield await task
+
+async def run(pairs, output, **options):
+    count = 0
+    async for record in fetch_and_analyze(pairs, **options):
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pairs', help='CSV (artist,song) or JSONL ({"artist", "song"}) file')
+    parser.add_argument('--output', '-o', help='JSONL output path (default: stdout)')
+    parser.add_argument('--concurrency', '-c', type=int, default=8,
+                        help='lookups in flight at once')
+    parser.add_argument('--rate', '-r', type=float, default=5.0,
+                        help='maximum lookups started per second (0 for no limit)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='analysis worker processes (default: all cores)')
+    parser.add_argument('--sensitivity', '-s', type=int, default=70,
+                        help='sensitivity 0-100 used for analysis')
+    parser.add_argument('--full', action='store_true',
+                        help='include the full /analyze response instead of score and groups')
+    args = parser.parse_args()
+
+    options = dict(sensitivity=args.sensitivity, concurrency=args.concurrency,
+                   rate=args.rate, workers=args.workers, full=args.full)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+
+    try:
+        # Lookup progress messages go to stderr so stdout stays valid JSONL
+        with contextlib.redirect_stdout(sys.stderr):
+            total = asyncio.run(run(read_pairs(args.pairs), output, **options))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Fetched and analyzed {total} songs", file=sys.stderr)
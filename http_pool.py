@@ -0,0 +1,111 @@
+"""Shared pooled HTTP client for Genius API calls and page scraping
+
+One requests.Session with keep-alive connection pools is reused across
+threads, so repeat lookups skip the TCP/TLS handshakes. Idempotent requests
+are retried with exponential backoff on 429 and 5xx (honouring Retry-After),
+and a per-host semaphore caps how many requests hit one host at a time. A
+streamed response (stream=True) keeps its host slot until its body has been
+read or it is closed, since the body is still downloading until then.
+"""
+
+import http.cookiejar
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class PooledHTTPClient:
+    """Thread-safe HTTP client with connection reuse, retries and per-host limits"""
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_factor=0.5,
+                 per_host_limit=4, timeout=10):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=retry, pool_block=True)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Never store cookies, so the shared session holds no per-request state
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+    def get(self, url, **kwargs):
+        """GET a URL through the shared pool, waiting for a free slot on its host
+
+        With stream=True the slot is held until the body has been iterated
+        or the response is closed; use the response as a context manager.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        slots = self._slots_for(urlsplit(url).netloc)
+        if not kwargs.get('stream'):
+            with slots:
+                return self.session.get(url, **kwargs)
+
+        slots.acquire()
+        try:
+            response = self.session.get(url, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        hold_slot_until_consumed(response, slots)
+        return response
+
+    def close(self):
+        self.session.close()
+
+    def _slots_for(self, host):
+        """Get the semaphore limiting concurrent requests to one host"""
+        slots = self._host_slots.get(host)
+        if slots is None:
+            with self._host_slots_lock:
+                slots = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+        return slots
+
+def hold_slot_until_consumed(response, slots):
+    """Release a streamed response's host slot once, when its body is exhausted or it is closed"""
+    released = []
+    lock = threading.Lock()
+
+    def release():
+        with lock:
+            if released:
+                return
+            released.append(True)
+        slots.release()
+
+    iter_content, close = response.iter_content, response.close
+
+    # .content and iter_lines() read through iter_content too
+    def iter_content_then_release(*args, **kwargs):
+        try:
+            yield from iter_content(*args, **kwargs)
+        finally:
+            release()
+
+    def close_then_release():
+        try:
+            close()
+        finally:
+            release()
+
+    response.iter_content = iter_content_then_release
+    response.close = close_then_release
+    # A response dropped without being read or closed still frees its slot
+    weakref.finalize(response, release)
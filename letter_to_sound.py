@@ -0,0 +1,236 @@
+"""Letter-to-sound pronunciations for words missing from the CMU dictionary
+
+Slang, brand names and run-together compounds in lyrics often have no CMU
+entry. guess_pronunciation builds an ARPAbet pronunciation for them
+locally, trying in order:
+
+1. Slang respellings of dictionary words ("trippin" -> "tripping" with a
+   final N, "gangsta" -> "gangster", "boyz" -> "boys")
+2. A dictionary stem plus an inflection or common suffix ("tainting" ->
+   "taint" + IH0 NG, "chastising" -> "chastise" + IH0 NG)
+3. A split into dictionary words ("swordquest" -> "sword" + "quest")
+4. The longest dictionary word the spelling ends with for the tail
+   ("arzest" -> "zest"), with letter rules for the rest
+5. Letter rules for the whole word
+
+Dictionary pieces keep their own pronunciations, so the rhyming part of a
+guess usually comes straight from CMU. The first and last pieces keep
+their primary stress and only middle pieces are demoted to secondary
+stress, so a guess rhymes on its last piece's stressed vowel. Results are
+not cached here; callers memoize them.
+"""
+
+import re
+
+# Shortest dictionary pieces used when splitting a word. CMU is full of short
+# abbreviations and suffix-like entries ("ing", "phy") that would otherwise
+# match almost anything, so pieces after the first must be longer.
+MIN_PIECE_LENGTH = 3
+MIN_TAIL_LENGTH = 4
+MAX_PIECES = 3
+
+# Unstressed endings added to a dictionary stem, longest first; None means
+# the sound depends on the stem's last phoneme (see inflection_sound)
+SUFFIXES = [
+    ('ness', 'N AH0 S'), ('less', 'L AH0 S'), ('ment', 'M AH0 N T'),
+    ('ers', 'ER0 Z'), ('est', 'AH0 S T'), ('ing', 'IH0 NG'), ('ful', 'F AH0 L'),
+    ('es', None), ('ed', None), ('er', 'ER0'), ('ly', 'L IY0'), ('s', None), ('y', 'IY0'),
+]
+SIBILANTS = {'S', 'Z', 'SH', 'ZH', 'CH', 'JH'}
+VOICELESS = {'P', 'T', 'K', 'F', 'TH', 'S', 'SH', 'CH', 'HH'}
+
+# Grapheme rules, longest first; each maps a spelling to ARPAbet without stress
+GRAPHEME_RULES = [
+    ('tion', 'SH AH N'), ('sion', 'ZH AH N'), ('ture', 'CH ER'),
+    ('eigh', 'EY'), ('augh', 'AO'), ('ough', 'AO'),
+    ('igh', 'AY'), ('tch', 'CH'), ('dge', 'JH'), ('sch', 'S K'),
+    ('ch', 'CH'), ('sh', 'SH'), ('th', 'TH'), ('ph', 'F'), ('wh', 'W'), ('gh', 'G'),
+    ('ck', 'K'), ('ng', 'NG'), ('nk', 'NG K'), ('qu', 'K W'), ('kn', 'N'), ('wr', 'R'),
+    ('ee', 'IY'), ('ea', 'IY'), ('ie', 'IY'), ('ey', 'IY'),
+    ('oo', 'UW'), ('ou', 'AW'), ('ow', 'OW'), ('oa', 'OW'), ('oe', 'OW'),
+    ('oi', 'OY'), ('oy', 'OY'), ('ai', 'EY'), ('ay', 'EY'), ('ei', 'EY'),
+    ('au', 'AO'), ('aw', 'AO'), ('ew', 'UW'), ('ue', 'UW'), ('ui', 'UW'),
+    ('ar', 'AA R'), ('er', 'ER'), ('ir', 'ER'), ('ur', 'ER'), ('or', 'AO R'),
+    ('a', 'AE'), ('e', 'EH'), ('i', 'IH'), ('o', 'AA'), ('u', 'AH'),
+    ('b', 'B'), ('c', 'K'), ('d', 'D'), ('f', 'F'), ('g', 'G'), ('h', 'HH'),
+    ('j', 'JH'), ('k', 'K'), ('l', 'L'), ('m', 'M'), ('n', 'N'), ('p', 'P'),
+    ('r', 'R'), ('s', 'S'), ('t', 'T'), ('v', 'V'), ('w', 'W'), ('x', 'K S'),
+    ('y', 'IY'), ('z', 'Z'),
+]
+MAX_GRAPHEME_LENGTH = max(len(spelling) for spelling, _ in GRAPHEME_RULES)
+GRAPHEMES = dict(GRAPHEME_RULES)
+
+# Long vowels for a vowel-consonant-e ending ("bike", "tone")
+MAGIC_E_VOWELS = {'a': 'EY', 'e': 'IY', 'i': 'AY', 'o': 'OW', 'u': 'UW', 'y': 'AY'}
+
+VOWEL_LETTERS = set('aeiouy')
+ARPABET_VOWELS = {'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW'}
+
+WORD_PATTERN = re.compile(r'^[a-z]+$')
+
+def guess_pronunciation(word, lookup):
+    """Guess an ARPAbet pronunciation for a lowercase word, or None if it has no letters to go on
+
+    lookup(word) returns the word's CMU pronunciations (an empty list when
+    unknown), e.g. pronouncing.phones_for_word.
+    """
+    if not WORD_PATTERN.match(word):
+        return None
+
+    def known(piece):
+        phones = lookup(piece)
+        return phones[0] if phones else None
+
+    phones = known(word) or respelled_pronunciation(word, known) or inflected_pronunciation(word, known)
+    if phones:
+        return phones
+
+    pieces = split_into_words(word, known)
+    if pieces:
+        return join_pieces([known(piece) for piece in pieces])
+
+    for start in range(1, len(word) - MIN_TAIL_LENGTH + 1):
+        tail = known(word[start:])
+        if tail:
+            head = spell_out(word[:start], stressed=False)
+            return f"{head} {tail}" if head else tail
+
+    return spell_out(word)
+
+def respelled_pronunciation(word, known):
+    """Pronounce common slang spellings from the dictionary word they stand for"""
+    if word.endswith('in') and len(word) > 3:
+        phones = known(word + 'g')
+        if phones and phones.endswith('NG'):
+            return phones[:-2] + 'N'
+
+    if word.endswith('a') and len(word) > 3:
+        phones = known(word[:-1] + 'er')
+        if phones and phones.endswith('ER0'):
+            return phones[:-3] + 'AH0'
+
+    if word.endswith('z') and len(word) > 3:
+        return known(word[:-1] + 's')
+
+    return None
+
+def inflected_pronunciation(word, known):
+    """Pronounce a dictionary stem plus a suffix, trying the usual spelling changes at the join"""
+    for suffix, sound in SUFFIXES:
+        stem = word[:-len(suffix)]
+        if not word.endswith(suffix) or len(stem) < MIN_PIECE_LENGTH:
+            continue
+
+        # "chastis|ing" -> chastise, "stripp|ing" -> strip, "happi|ness" -> happy
+        candidates = [stem, stem + 'e']
+        if len(stem) > MIN_PIECE_LENGTH and stem[-1] == stem[-2]:
+            candidates.append(stem[:-1])
+        if stem.endswith('i'):
+            candidates.append(stem[:-1] + 'y')
+
+        for candidate in candidates:
+            phones = known(candidate)
+            if phones:
+                return f"{phones} {sound or inflection_sound(suffix, phones)}"
+
+    return None
+
+def inflection_sound(suffix, stem_phones):
+    """-s/-es and -ed endings, which sound different after different stem endings"""
+    last = stem_phones.split()[-1].rstrip('012')
+    if suffix in ('s', 'es'):
+        if last in SIBILANTS:
+            return 'IH0 Z'
+        return 'S' if last in VOICELESS else 'Z'
+    if last in ('T', 'D'):
+        return 'IH0 D'
+    return 'T' if last in VOICELESS else 'D'
+
+def split_into_words(word, known):
+    """Split a word into the fewest dictionary words (up to MAX_PIECES), or None"""
+    # best[i]: fewest pieces covering word[:i], as a list of pieces
+    best = [None] * (len(word) + 1)
+    best[0] = []
+
+    for end in range(MIN_PIECE_LENGTH, len(word) + 1):
+        for start in range(0, end - MIN_PIECE_LENGTH + 1):
+            if best[start] is None or len(best[start]) >= MAX_PIECES:
+                continue
+            if start and end - start < MIN_TAIL_LENGTH:
+                continue
+            if best[end] is not None and len(best[end]) <= len(best[start]) + 1:
+                continue
+            if known(word[start:end]):
+                best[end] = best[start] + [word[start:end]]
+
+    pieces = best[len(word)]
+    return pieces if pieces and len(pieces) > 1 else None
+
+def join_pieces(pronunciations):
+    """Concatenate pronunciations, demoting primary stress to secondary on the middle pieces
+
+    The last piece keeps its primary stress, so the joined word still rhymes
+    on its final stressed vowel like the last piece does on its own.
+    """
+    if len(pronunciations) < 3:
+        return ' '.join(pronunciations)
+    middle = [phones.replace('1', '2') for phones in pronunciations[1:-1]]
+    return ' '.join([pronunciations[0], *middle, pronunciations[-1]])
+
+def spell_out(word, stressed=True):
+    """Pronounce a spelling with grapheme rules; the first vowel is stressed if requested"""
+    phonemes = []
+    i = 0
+    length = len(word)
+
+    while i < length:
+        # Vowel + single consonant + final e: long vowel, silent e
+        if (i == length - 3 and word[i] in MAGIC_E_VOWELS and word[i + 1] not in VOWEL_LETTERS
+                and word[i + 2] == 'e' and length > 3):
+            phonemes.append(MAGIC_E_VOWELS[word[i]])
+            phonemes.extend(GRAPHEMES[word[i + 1]].split())
+            break
+
+        # Word-initial y is a consonant; a doubled consonant is said once
+        if word[i] == 'y' and i == 0:
+            phonemes.append('Y')
+            i += 1
+            continue
+        if i > 0 and word[i] == word[i - 1] and word[i] not in VOWEL_LETTERS:
+            i += 1
+            continue
+
+        # Soft c and g before e, i, y
+        if word[i] in 'cg' and i + 1 < length and word[i + 1] in 'eiy':
+            phonemes.append('S' if word[i] == 'c' else 'JH')
+            i += 1
+            continue
+
+        # Final a is a schwa ("finna", "shorta")
+        if word[i] == 'a' and i == length - 1 and i > 0:
+            phonemes.append('AH')
+            break
+
+        # Final silent e after a consonant
+        if word[i] == 'e' and i == length - 1 and i > 0 and phonemes and phonemes[-1] not in ARPABET_VOWELS:
+            break
+
+        for size in range(min(MAX_GRAPHEME_LENGTH, length - i), 0, -1):
+            sound = GRAPHEMES.get(word[i:i + size])
+            if sound:
+                phonemes.extend(sound.split())
+                i += size
+                break
+        else:
+            i += 1
+
+    stressed_vowel = False
+    result = []
+    for phoneme in phonemes:
+        if phoneme in ARPABET_VOWELS:
+            stress = '1' if stressed and not stressed_vowel else '0'
+            stressed_vowel = True
+            phoneme += stress
+        result.append(phoneme)
+
+    return ' '.join(result) if result else None
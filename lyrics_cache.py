@@ -0,0 +1,192 @@
+"""Persistent SQLite cache for Genius lyrics lookups
+
+Songs are stored once per Genius song ID. Each normalized artist/song query
+points at the song it resolved to, so repeat searches, and different
+searches that land on the same song, skip both the Genius search and the
+page scrape.
+
+The SQLite connection is opened on first use, and a forked child (a
+gunicorn --preload worker, a process pool worker) drops the one it
+inherited and opens its own, since SQLite connections must not be shared
+across fork(). A cache file that can't be opened or read is reported once
+and then treated as empty, so lookups fall back to Genius.
+
+Reads only write back a song's last access time when it is more than
+touch_interval seconds old, so repeat hits stay read-only and concurrent
+readers don't queue behind write transactions.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).parent / 'lyrics_cache.sqlite3'
+TOUCH_INTERVAL = 300
+
+def normalize_query(artist, song):
+    """Normalize an artist/song pair into a cache key"""
+    def normalize(value):
+        return ' '.join(re.sub(r'[^\w]+', ' ', value.casefold()).split())
+    return f"{normalize(artist)}|{normalize(song)}"
+
+class LyricsCache:
+    """Song lyrics keyed by Genius ID and normalized query, with TTL and LRU eviction"""
+
+    def __init__(self, path=DEFAULT_PATH, ttl=7 * 24 * 3600, max_entries=10000, touch_interval=TOUCH_INTERVAL):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._conn = None
+        self._inherited = []  # parents' connections, kept open so a child never closes them
+
+        this = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: this() and this()._after_fork())
+
+    def get(self, artist, song):
+        """Get cached song info for an artist/song query, or None"""
+        def get(conn):
+            row = conn.execute(
+                'SELECT genius_id FROM queries WHERE query_key = ?',
+                (normalize_query(artist, song),)
+            ).fetchone()
+            return self._get_song(conn, row[0]) if row else None
+        return self._run(get)
+
+    def get_by_id(self, genius_id):
+        """Get cached song info for a Genius song ID, or None"""
+        if genius_id is None:
+            return None
+        return self._run(lambda conn: self._get_song(conn, genius_id))
+
+    def put(self, artist, song, song_info):
+        """Store song info under its Genius ID and the query that found it"""
+        genius_id = song_info.get('genius_id')
+        if genius_id is None:
+            return
+
+        def put(conn):
+            now = time.time()
+            conn.execute(
+                'INSERT OR REPLACE INTO songs (genius_id, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (genius_id, json.dumps(song_info), now, now)
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO queries (query_key, genius_id) VALUES (?, ?)',
+                (normalize_query(artist, song), genius_id)
+            )
+            self._evict(conn)
+            conn.commit()
+        self._run(put)
+
+    def link(self, artist, song, genius_id):
+        """Point another query at an already cached song"""
+        def link(conn):
+            conn.execute(
+                'INSERT OR REPLACE INTO queries (query_key, genius_id) VALUES (?, ?)',
+                (normalize_query(artist, song), genius_id)
+            )
+            conn.commit()
+        self._run(link)
+
+    def stats(self):
+        """Entry counts for monitoring"""
+        def counts(conn):
+            return (conn.execute('SELECT COUNT(*) FROM songs').fetchone()[0],
+                    conn.execute('SELECT COUNT(*) FROM queries').fetchone()[0])
+        songs, queries = self._run(counts, (0, 0))
+        return {'songs': songs, 'queries': queries, 'max_entries': self.max_entries, 'ttl': self.ttl,
+                'disabled': self.disabled}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _run(self, operation, default=None):
+        """Run operation(connection) under the lock; a SQLite error disables the cache and returns default"""
+        with self._lock:
+            if self.disabled:
+                return default
+            try:
+                return operation(self._connection())
+            except sqlite3.Error as e:
+                print(f"⚠ Warning: Lyrics cache at {self.path} failed, continuing without it: {e}")
+                self.disabled = True
+                if self._conn is not None:
+                    self._inherited.append(self._conn)
+                    self._conn = None
+                return default
+
+    def _connection(self):
+        """This process's connection, opened and set up on first use (caller holds the lock)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS songs (
+                    genius_id INTEGER PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS songs_accessed_at ON songs (accessed_at);
+                CREATE TABLE IF NOT EXISTS queries (
+                    query_key TEXT PRIMARY KEY,
+                    genius_id INTEGER NOT NULL
+                );
+            ''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _after_fork(self):
+        # The lock may have been held by a thread that doesn't exist in the child
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            self._inherited.append(self._conn)
+            self._conn = None
+
+    def _get_song(self, conn, genius_id):
+        """Read a song, dropping it if expired (caller holds the lock)"""
+        row = conn.execute(
+            'SELECT payload, created_at, accessed_at FROM songs WHERE genius_id = ?', (genius_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, created_at, accessed_at = row
+        now = time.time()
+        if self.ttl and now - created_at > self.ttl:
+            conn.execute('DELETE FROM songs WHERE genius_id = ?', (genius_id,))
+            conn.execute('DELETE FROM queries WHERE genius_id = ?', (genius_id,))
+            conn.commit()
+            return None
+
+        # Eviction only needs a rough recency, so most hits skip the write
+        if now - accessed_at >= self.touch_interval:
+            conn.execute('UPDATE songs SET accessed_at = ? WHERE genius_id = ?', (now, genius_id))
+            conn.commit()
+        return json.loads(payload)
+
+    def _evict(self, conn):
+        """Drop least recently used songs beyond max_entries (caller holds the lock)"""
+        count = conn.execute('SELECT COUNT(*) FROM songs').fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        conn.execute(
+            'DELETE FROM songs WHERE genius_id IN '
+            '(SELECT genius_id FROM songs ORDER BY accessed_at ASC LIMIT ?)',
+            (excess,)
+        )
+        conn.execute('DELETE FROM queries WHERE genius_id NOT IN (SELECT genius_id FROM songs)')
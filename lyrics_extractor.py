@@ -0,0 +1,116 @@
+"""Streaming extractor for Genius lyrics containers
+
+Parsing a whole Genius page into a BeautifulSoup tree is the slow part of
+scraping. LyricsContainerParser streams the page through the standard
+library HTML tokenizer and keeps text only from data-lyrics-container divs,
+so no tree is built and everything outside the lyrics is thrown away.
+
+The text matches what BeautifulSoup's get_text(separator='\\n', strip=True)
+returns for those divs after scrape_genius_lyrics drops ad elements: every
+script/style/div whose class contains "ad" is skipped, and so is text inside
+script, style and template tags and comments.
+"""
+
+from html.parser import HTMLParser
+
+# Tags that never have a closing tag, so they never open a nesting level
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'spacer', 'track', 'wbr', 'basefont',
+    'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid'
+}
+
+# Tags whose contents are not text for get_text()
+NON_TEXT_ELEMENTS = {'script', 'style', 'template'}
+
+class LyricsContainerParser(HTMLParser):
+    """Collect the text of every data-lyrics-container div as the page streams in"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.containers = []    # finished text chunks, one list per container
+        self._strings = None    # chunks for the container being read
+        self._stack = []        # open tags inside the current container
+        self._skip_depth = None  # stack depth where a skipped element opened
+        self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+
+        if self._strings is None:
+            if tag == 'div' and ('data-lyrics-container', 'true') in attrs:
+                self._strings = []
+                self._stack = ['div']
+            return
+
+        if tag in VOID_ELEMENTS:
+            return
+
+        self._stack.append(tag)
+        if self._skip_depth is None and (tag in NON_TEXT_ELEMENTS or self._is_ad(tag, attrs)):
+            self._skip_depth = len(self._stack)
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if self._strings is None or tag not in self._stack:
+            return
+
+        # Close everything opened since the matching start tag
+        while self._stack:
+            if self._skip_depth is not None and len(self._stack) <= self._skip_depth:
+                self._skip_depth = None
+            if self._stack.pop() == tag:
+                break
+
+        if not self._stack:
+            self.containers.append(self._strings)
+            self._strings = None
+
+    def handle_comment(self, data):
+        # Comments aren't text, but like any other node they split the surrounding strings
+        self._flush()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def handle_data(self, data):
+        if self._strings is not None and self._skip_depth is None:
+            self._buffer.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+        if self._strings is not None:
+            self.containers.append(self._strings)
+            self._strings = None
+
+    def text(self):
+        """Container texts joined the way scrape_genius_lyrics joins them"""
+        return ''.join('\n'.join(strings) + '\n' for strings in self.containers)
+
+    def _flush(self):
+        if self._buffer:
+            text = ''.join(self._buffer).strip()
+            self._buffer = []
+            if text:
+                self._strings.append(text)
+
+    @staticmethod
+    def _is_ad(tag, attrs):
+        if tag not in ('script', 'style', 'div'):
+            return False
+        classes = dict(attrs).get('class')
+        return bool(classes) and 'ad' in classes.lower()
+
+def extract_lyrics_containers(chunks):
+    """Stream text chunks through the parser; returns container text or None if there are none"""
+    parser = LyricsContainerParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+
+    if not parser.containers:
+        return None
+    return parser.text()
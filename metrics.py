@@ -0,0 +1,197 @@
+"""In-process counters and latency histograms with a Prometheus text export
+
+Metrics records per-stage analysis timings, work counters and Genius fetch
+latencies, and renders them in the Prometheus text exposition format for
+/metrics. Inside a request() block, stage timings and counts are also
+collected for that request alone, so they can be returned with the
+response.
+
+A Metrics built with enabled=False records nothing: stage() and timer()
+hand back a shared no-op context manager and count() returns at once.
+Per-word hot paths check metrics.enabled themselves and skip their timing
+code entirely.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds in seconds, like the Prometheus client defaults
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_HISTOGRAM = 'rhyme_analysis_stage_seconds'
+NULL_CONTEXT = nullcontext()
+
+class Metrics:
+    """Thread-safe counters and histograms, optionally tracked per request"""
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._help = {}        # name -> (type, help text)
+        self._local = threading.local()
+
+    def describe(self, name, kind, text):
+        """Set the # TYPE and # HELP lines for a metric"""
+        self._help[name] = (kind, text)
+
+    def count(self, name, value=1, **labels):
+        """Add to a counter (and to the current request's counts)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+        current = getattr(self._local, 'request', None)
+        if current is not None:
+            current['counts'][name] = current['counts'].get(name, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            else:
+                histogram[len(self.buckets)] += 1
+            histogram[-1] += seconds
+
+    def timer(self, name, **labels):
+        """Context manager observing how long its block takes"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self._timed(name, None, labels)
+
+    def stage(self, stage):
+        """Time one analysis stage, into the stage histogram and the current request"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self._timed(STAGE_HISTOGRAM, stage, {'stage': stage})
+
+    def accumulate(self, stage, counter=None):
+        """Context manager summing add_stage_time calls for a stage into one observation
+
+        The summed time is recorded when the block ends, and the number of
+        calls is added to counter. Nested blocks for the same stage add to
+        the outermost one.
+        """
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self._accumulated(stage, counter)
+
+    def add_stage_time(self, stage, seconds):
+        """Add one call's time to a stage being accumulated; outside an accumulate() block it is dropped
+
+        Only this thread's running total is updated, so this is cheap
+        enough to call once per word.
+        """
+        total = self._local.__dict__.get('stage_totals', {}).get(stage)
+        if total is not None:
+            total[0] += seconds
+            total[1] += 1
+
+    @contextmanager
+    def request(self):
+        """Collect this thread's stage timings and counts until the block ends"""
+        current = {'stages': {}, 'counts': {}}
+        previous = getattr(self._local, 'request', None)
+        self._local.request = current
+        try:
+            yield current
+        finally:
+            self._local.request = previous
+
+    def render(self, extra=()):
+        """Prometheus text format; extra is (name, type, help, [(labels dict, value), ...]) tuples"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(values)) for key, values in self._histograms.items())
+
+        lines = []
+        described = set()
+
+        def header(name, default_kind):
+            if name not in described:
+                described.add(name)
+                kind, text = self._help.get(name, (default_kind, ''))
+                if text:
+                    lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{format_labels(dict(labels))} {format_value(value)}")
+
+        for (name, labels), values in histograms:
+            header(name, 'histogram')
+            labels = dict(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), values):
+                cumulative += bucket_count
+                le = bound if bound == '+Inf' else format_value(bound)
+                lines.append(f"{name}_bucket{format_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(values[-1])}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+        for name, kind, text, samples in extra:
+            self._help.setdefault(name, (kind, text))
+            header(name, kind)
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+    @contextmanager
+    def _timed(self, name, stage, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(name, elapsed, **labels)
+            if stage is not None:
+                self._add_request_stage(stage, elapsed)
+
+    @contextmanager
+    def _accumulated(self, stage, counter):
+        totals = self._local.__dict__.setdefault('stage_totals', {})
+        if stage in totals:
+            yield
+            return
+
+        total = totals[stage] = [0.0, 0]
+        try:
+            yield
+        finally:
+            del totals[stage]
+            if total[1]:
+                self.observe(STAGE_HISTOGRAM, total[0], stage=stage)
+                self._add_request_stage(stage, total[0])
+                if counter:
+                    self.count(counter, total[1])
+
+    def _add_request_stage(self, stage, seconds):
+        current = getattr(self._local, 'request', None)
+        if current is not None:
+            current['stages'][stage] = current['stages'].get(stage, 0.0) + seconds
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,134 @@
+"""Multisyllabic and internal rhyme detection over vowel n-grams
+
+Whole-word grouping only compares each word's ending, so it can't see
+rhymes like "lose yourself" / "whose health" / "Zeus itself", where a run of
+vowel sounds repeats across word boundaries and inside lines.
+find_multisyllabic_rhymes indexes every run of MIN_VOWELS..MAX_VOWELS vowel
+sounds in the text by a hash of the sounds (stress ignored), so repeats are
+found with one pass per n-gram length instead of comparing positions
+pairwise:
+
+1. Each line becomes a stream of vowels; a word with no pronunciation
+   breaks the stream, so n-grams never span it or a line break.
+2. N-grams are indexed longest first. An n-gram must start on a stressed
+   vowel, because rhymes line up on stressed syllables.
+3. Occurrences of one n-gram become a chain while each is within
+   MAX_LINE_GAP lines of the previous one. A chain needs at least two
+   different spellings, so repeated phrases (hooks) are not rhymes.
+4. Shorter n-grams that only repeat inside longer reported chains are
+   dropped, so each rhyme is reported at its full length.
+
+The work is linear in the number of vowels times the n-gram lengths tried.
+"""
+
+MIN_VOWELS = 2
+MAX_VOWELS = 5
+MAX_LINE_GAP = 4
+
+def vowel_runs(words):
+    """Split word records into runs of (vowel, stressed, word record) with no gaps
+
+    words are dicts with 'line_index', 'word_index' and 'phones' (None when
+    unknown), in text order.
+    """
+    runs = []
+    run = []
+    previous = None
+
+    for word in words:
+        contiguous = (previous is not None and word['line_index'] == previous['line_index']
+                      and word['word_index'] == previous['word_index'] + 1)
+        if not contiguous and run:
+            runs.append(run)
+            run = []
+        previous = word
+
+        if not word['phones']:
+            previous = None
+            continue
+
+        for phoneme in word['phones'].split():
+            if phoneme[-1] in '012':
+                run.append((phoneme[:-1], phoneme[-1] != '0', word))
+
+    if run:
+        runs.append(run)
+    return runs
+
+def find_multisyllabic_rhymes(words, min_vowels=MIN_VOWELS, max_vowels=MAX_VOWELS, max_line_gap=MAX_LINE_GAP):
+    """Chains of word spans sharing a sequence of vowel sounds, in text order"""
+    runs = vowel_runs(words)
+    covered = set()  # (run, start, length) spans inside an occurrence already reported
+    chains = []
+
+    for length in range(max_vowels, min_vowels - 1, -1):
+        index = {}
+        for run_id, run in enumerate(runs):
+            for start in range(len(run) - length + 1):
+                if run[start][1]:
+                    key = tuple(vowel for vowel, _, _ in run[start:start + length])
+                    index.setdefault(key, []).append((run_id, start))
+
+        for key, positions in index.items():
+            if len(positions) < 2:
+                continue
+            for chain in split_chains(runs, positions, length, max_line_gap):
+                if all((run_id, start, length) in covered for run_id, start in chain):
+                    continue
+
+                occurrences = [occurrence(runs[run_id][start:start + length]) for run_id, start in chain]
+                if len({o['key'] for o in occurrences}) < 2:
+                    continue
+
+                for run_id, start in chain:
+                    cover(covered, run_id, start, length, min_vowels)
+                chains.append({
+                    'vowels': ' '.join(key),
+                    'syllables': length,
+                    'occurrences': [{k: v for k, v in o.items() if k != 'key'} for o in occurrences]
+                })
+
+    chains.sort(key=lambda c: (c['occurrences'][0]['line_index'], c['occurrences'][0]['word_start'], -c['syllables']))
+    return chains
+
+def split_chains(runs, positions, length, max_line_gap):
+    """Group an n-gram's positions into chains of nearby, non-overlapping occurrences"""
+    chains = []
+    chain = []
+    last_run, last_end, last_line = None, 0, None
+
+    for run_id, start in positions:
+        if run_id == last_run and start < last_end:
+            continue
+        line = runs[run_id][start][2]['line_index']
+        if chain and line - last_line > max_line_gap:
+            if len(chain) > 1:
+                chains.append(chain)
+            chain = []
+        chain.append((run_id, start))
+        last_run, last_end, last_line = run_id, start + length, line
+
+    if len(chain) > 1:
+        chains.append(chain)
+    return chains
+
+def cover(covered, run_id, start, length, min_vowels):
+    """Mark every shorter span inside an occurrence as already reported"""
+    for sub_length in range(min_vowels, length + 1):
+        for sub_start in range(start, start + length - sub_length + 1):
+            covered.add((run_id, sub_start, sub_length))
+
+def occurrence(vowels):
+    """The words a run of vowels spans"""
+    first, last = vowels[0][2], vowels[-1][2]
+    words = []
+    for _, _, word in vowels:
+        if not words or words[-1] is not word:
+            words.append(word)
+    return {
+        'line_index': first['line_index'],
+        'word_start': first['word_index'],
+        'word_end': last['word_index'],
+        'text': ' '.join(word['original'] for word in words),
+        'key': ' '.join(word['clean'] for word in words),
+    }
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Prebuilt binary pronunciation and rhyme index
+
+pronouncing parses the whole CMU dictionary into Python lists and dicts on
+first use, which every process pays for at startup. This module writes the
+same data once into a compact file of flat arrays and hash tables:
+
+    word -> pronunciations (in CMU order)
+    pronunciation -> rhyming part
+    rhyming part -> words
+
+The file is memory-mapped read-only, so opening it costs nothing up front,
+lookups decode only the entries they touch, and every worker process that
+maps it shares the same page-cache pages. No process holds a Python-object
+copy of the dictionary.
+
+Build it after installing requirements (app.py falls back to pronouncing
+when the file is missing):
+
+    python phonetic_store.py
+    python phonetic_store.py path/to/phonetic_store.bin
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+
+MAGIC = b'RHYMSTOR'
+FORMAT_VERSION = 1
+DEFAULT_PATH = Path(__file__).parent / 'phonetic_store.bin'
+
+# Sections in file order; arrays are little-endian uint32, blobs are UTF-8
+SECTIONS = (
+    'word_offsets',     # word i is word_blob[word_offsets[i]:word_offsets[i + 1]]
+    'word_blob',
+    'word_prons',       # word i has pronunciations word_prons[i]..word_prons[i + 1] - 1
+    'pron_offsets',     # pronunciation j is pron_blob[pron_offsets[j]:pron_offsets[j + 1]]
+    'pron_blob',
+    'pron_rhymes',      # rhyming part id of pronunciation j
+    'rhyme_offsets',    # rhyming part k is rhyme_blob[rhyme_offsets[k]:rhyme_offsets[k + 1]]
+    'rhyme_blob',
+    'rhyme_words',      # rhyming part k's words are rhyme_word_ids[rhyme_words[k]:rhyme_words[k + 1]]
+    'rhyme_word_ids',
+    'word_table',       # open-addressing hash table of word id + 1 (0 = empty slot)
+    'rhyme_table',      # same, for rhyming part ids
+)
+ARRAY_SECTIONS = set(SECTIONS) - {'word_blob', 'pron_blob', 'rhyme_blob'}
+
+HEADER = struct.Struct('<8sII')
+SECTION_ENTRY = struct.Struct('<QQ')
+
+def rhyming_part(phones):
+    """Everything from the last stressed vowel on, like pronouncing.rhyming_part"""
+    phones_list = phones.split()
+    for i in range(len(phones_list) - 1, 0, -1):
+        if phones_list[i][-1] in '12':
+            return ' '.join(phones_list[i:])
+    return phones
+
+def _hash(key):
+    return zlib.crc32(key)
+
+def _table_size(count):
+    size = 1
+    while size < count * 2:
+        size <<= 1
+    return size
+
+def _hash_table(keys):
+    """Linear-probing table mapping each key's hash to its index + 1"""
+    table = array('I', [0]) * _table_size(len(keys))
+    mask = len(table) - 1
+    for index, key in enumerate(keys):
+        slot = _hash(key) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = index + 1
+    return table
+
+def _string_table(strings):
+    """Offsets array and concatenated UTF-8 blob for a list of strings"""
+    offsets = array('I', [0])
+    encoded = []
+    for string in strings:
+        data = string.encode('utf-8')
+        encoded.append(data)
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b''.join(encoded), encoded
+
+def build_store(path=DEFAULT_PATH):
+    """Write the binary index for the CMU dictionary bundled with pronouncing"""
+    import pronouncing
+    pronouncing.init_cmu()
+
+    words = []
+    word_ids = {}
+    word_prons = array('I', [0])
+    pronunciations = []
+    pron_rhymes = array('I')
+    rhymes = {}
+    rhyme_members = []
+
+    # Group pronunciations by word, keeping the dictionary's order within each word
+    prons_by_word = {}
+    for word, phones in pronouncing.pronunciations:
+        if word not in prons_by_word:
+            prons_by_word[word] = []
+            word_ids[word] = len(words)
+            words.append(word)
+        prons_by_word[word].append(phones)
+
+    for word in words:
+        for phones in prons_by_word[word]:
+            rhyme_part = rhyming_part(phones)
+            rhyme_id = rhymes.setdefault(rhyme_part, len(rhymes))
+            if rhyme_id == len(rhyme_members):
+                rhyme_members.append([])
+            # Words are visited in order, so a repeat can only be the last member
+            members = rhyme_members[rhyme_id]
+            if not members or members[-1] != word_ids[word]:
+                members.append(word_ids[word])
+
+            pronunciations.append(phones)
+            pron_rhymes.append(rhyme_id)
+        word_prons.append(len(pronunciations))
+
+    word_offsets, word_blob, encoded_words = _string_table(words)
+    pron_offsets, pron_blob, _ = _string_table(pronunciations)
+    rhyme_offsets, rhyme_blob, encoded_rhymes = _string_table(list(rhymes))
+
+    rhyme_words = array('I', [0])
+    rhyme_word_ids = array('I')
+    for members in rhyme_members:
+        rhyme_word_ids.extend(members)
+        rhyme_words.append(len(rhyme_word_ids))
+
+    sections = {
+        'word_offsets': word_offsets,
+        'word_blob': word_blob,
+        'word_prons': word_prons,
+        'pron_offsets': pron_offsets,
+        'pron_blob': pron_blob,
+        'pron_rhymes': pron_rhymes,
+        'rhyme_offsets': rhyme_offsets,
+        'rhyme_blob': rhyme_blob,
+        'rhyme_words': rhyme_words,
+        'rhyme_word_ids': rhyme_word_ids,
+        'word_table': _hash_table(encoded_words),
+        'rhyme_table': _hash_table(encoded_rhymes),
+    }
+
+    payloads = []
+    for name in SECTIONS:
+        data = sections[name]
+        if isinstance(data, array):
+            if sys.byteorder != 'little':
+                data = array('I', data)
+                data.byteswap()
+            data = data.tobytes()
+        payloads.append(data)
+
+    # Every section starts 8-byte aligned so arrays can be viewed in place
+    offset = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    entries = []
+    for data in payloads:
+        offset += -offset % 8
+        entries.append((offset, len(data)))
+        offset += len(data)
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS)))
+        for entry in entries:
+            f.write(SECTION_ENTRY.pack(*entry))
+        for (start, _), data in zip(entries, payloads):
+            f.write(b'\0' * (start - f.tell()))
+            f.write(data)
+    tmp_path.replace(path)
+
+    return len(words), len(pronunciations), len(rhymes)
+
+class PhoneticStore:
+    """Read-only lookups over a buffer written by build_store"""
+
+    def __init__(self, buffer):
+        if sys.byteorder != 'little':
+            raise ValueError('phonetic store arrays are little-endian')
+
+        if len(buffer) < HEADER.size + SECTION_ENTRY.size * len(SECTIONS):
+            raise ValueError('phonetic store is truncated')
+
+        magic, version, section_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or section_count != len(SECTIONS):
+            raise ValueError('not a phonetic store, or built by a different version')
+
+        self._buffer = buffer
+        self._view = view = memoryview(buffer)
+        for index, name in enumerate(SECTIONS):
+            start, length = SECTION_ENTRY.unpack_from(buffer, HEADER.size + index * SECTION_ENTRY.size)
+            if start + length > len(buffer):
+                raise ValueError('phonetic store is truncated')
+            section = view[start:start + length]
+            setattr(self, '_' + name, section.cast('I') if name in ARRAY_SECTIONS else section)
+
+        self.word_count = len(self._word_offsets) - 1
+        self.rhyme_count = len(self._rhyme_offsets) - 1
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH):
+        """Memory-map a store file read-only"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        """Release the section views and unmap the file"""
+        for name in SECTIONS:
+            getattr(self, '_' + name).release()
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __len__(self):
+        return self.word_count
+
+    def __contains__(self, word):
+        return self._word_id(word) is not None
+
+    def phones_for_word(self, word):
+        """All pronunciations for a word, like pronouncing.phones_for_word"""
+        word_id = self._word_id(word)
+        if word_id is None:
+            return []
+        return [self._pron(j) for j in range(self._word_prons[word_id], self._word_prons[word_id + 1])]
+
+    def rhyming_parts_for_word(self, word):
+        """The rhyming part of each of a word's pronunciations"""
+        word_id = self._word_id(word)
+        if word_id is None:
+            return []
+        return [self._rhyme(self._pron_rhymes[j])
+                for j in range(self._word_prons[word_id], self._word_prons[word_id + 1])]
+
+    def words_for_rhyming_part(self, rhyme_part):
+        """Every word with a pronunciation ending in this rhyming part"""
+        return list(self.rhyme_set(rhyme_part))
+
+    def rhyme_set(self, rhyme_part):
+        """Set-like view of the words for a rhyming part, read from the store on demand"""
+        return RhymingWords(self, self._lookup(self._rhyme_table, rhyme_part, self._rhyme))
+
+    def rhymes(self, word):
+        """Words rhyming with a word's first pronunciation, like pronouncing.rhymes"""
+        phones = self.phones_for_word(word)
+        if not phones:
+            return []
+        return [other for other in self.rhyme_set(rhyming_part(phones[0])) if other != word]
+
+    def _has_rhyme(self, word, rhyme_id):
+        word_id = self._word_id(word)
+        if word_id is None:
+            return False
+        return any(self._pron_rhymes[j] == rhyme_id
+                   for j in range(self._word_prons[word_id], self._word_prons[word_id + 1]))
+
+    def _word_id(self, word):
+        return self._lookup(self._word_table, word.lower(), self._word)
+
+    def _lookup(self, table, key, decode):
+        mask = len(table) - 1
+        slot = _hash(key.encode('utf-8')) & mask
+        while table[slot]:
+            index = table[slot] - 1
+            if decode(index) == key:
+                return index
+            slot = (slot + 1) & mask
+        return None
+
+    def _word(self, i):
+        return str(self._word_blob[self._word_offsets[i]:self._word_offsets[i + 1]], 'utf-8')
+
+    def _pron(self, j):
+        return str(self._pron_blob[self._pron_offsets[j]:self._pron_offsets[j + 1]], 'utf-8')
+
+    def _rhyme(self, k):
+        return str(self._rhyme_blob[self._rhyme_offsets[k]:self._rhyme_offsets[k + 1]], 'utf-8')
+
+class RhymingWords:
+    """Words sharing one rhyming part; membership checks the word's own pronunciations"""
+
+    __slots__ = ('_store', '_rhyme_id')
+
+    def __init__(self, store, rhyme_id):
+        self._store = store
+        self._rhyme_id = rhyme_id
+
+    def __contains__(self, word):
+        return self._rhyme_id is not None and self._store._has_rhyme(word, self._rhyme_id)
+
+    def __iter__(self):
+        if self._rhyme_id is None:
+            return
+        store = self._store
+        for i in store._rhyme_word_ids[store._rhyme_words[self._rhyme_id]:store._rhyme_words[self._rhyme_id + 1]]:
+            yield store._word(i)
+
+    def __len__(self):
+        if self._rhyme_id is None:
+            return 0
+        return self._store._rhyme_words[self._rhyme_id + 1] - self._store._rhyme_words[self._rhyme_id]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', nargs='?', default=str(DEFAULT_PATH), help='where to write the store')
+    args = parser.parse_args()
+
+    word_count, pron_count, rhyme_count = build_store(args.output)
+    size = Path(args.output).stat().st_size
+    print(f"✓ Wrote {args.output}: {word_count} words, {pron_count} pronunciations, "
+          f"{rhyme_count} rhyming parts ({size // 1024}KB)")
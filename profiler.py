@@ -0,0 +1,109 @@
+"""Stack-sampling profiler for requests that run over a latency budget
+
+Profiling every request with cProfile roughly doubles its cost, so this
+samples instead, and only requests that are already slow. Each profiled
+request registers its thread. One background thread wakes every
+`interval` seconds and, for any registered request older than `budget`,
+records the request thread's current stack from sys._current_frames().
+A request that finishes within the budget is never sampled.
+
+When a request ends over budget, its dump goes into a bounded ring buffer.
+The dump holds the duration, the caller's details (word count, sensitivity
+...), the sampled stacks in collapsed "outer;...;inner" form and the
+frames most often on top. Sampling starts once the budget has passed, so
+the samples show where the excess time went.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+
+class SlowRequestProfiler:
+    """Sample stacks of requests running past a budget and keep the last few dumps"""
+
+    def __init__(self, budget=1.0, interval=0.005, max_profiles=20, max_depth=64, top=50):
+        self.budget = budget
+        self.interval = interval
+        self.max_depth = max_depth
+        self.top = top
+        self.profiles = deque(maxlen=max_profiles)
+        self._active = {}  # thread id -> sampling state of the request running on it
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    @contextmanager
+    def profile(self, endpoint, describe=None):
+        """Profile the enclosed request if it runs over budget; describe() adds details to its dump"""
+        thread_id = threading.get_ident()
+        state = {'start': time.perf_counter(), 'stacks': Counter(), 'samples': 0}
+        with self._lock:
+            self._active[thread_id] = state
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name='slow-request-sampler', daemon=True)
+                self._sampler.start()
+
+        try:
+            yield
+        finally:
+            # Once unregistered, the sampler no longer touches this request's state
+            with self._lock:
+                self._active.pop(thread_id, None)
+            duration = time.perf_counter() - state['start']
+            if duration >= self.budget:
+                self._record(endpoint, duration, state, describe() if describe else {})
+
+    def dumps(self):
+        """Kept dumps, newest first"""
+        with self._lock:
+            return list(reversed(self.profiles))
+
+    def _record(self, endpoint, duration, state, details):
+        leaves = Counter()
+        for stack, count in state['stacks'].items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+
+        dump = {
+            'id': uuid.uuid4().hex[:12],
+            'endpoint': endpoint,
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_ms': round(duration * 1000, 1),
+            'budget_ms': round(self.budget * 1000, 1),
+            'interval_ms': round(self.interval * 1000, 1),
+            'samples': state['samples'],
+            **details,
+            'top_frames': [{'frame': frame, 'samples': count} for frame, count in leaves.most_common(self.top)],
+            'stacks': [{'stack': stack, 'samples': count} for stack, count in state['stacks'].most_common(self.top)],
+        }
+        with self._lock:
+            self.profiles.append(dump)
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                due = [(thread_id, state) for thread_id, state in self._active.items()
+                       if now - state['start'] >= self.budget]
+                if not due:
+                    continue
+
+                frames = sys._current_frames()
+                for thread_id, state in due:
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        state['stacks'][self._collapse(frame)] += 1
+                        state['samples'] += 1
+                del frames
+
+    def _collapse(self, frame):
+        """A stack as "outer;...;inner" of file:function:line entries, innermost max_depth frames"""
+        entries = []
+        while frame is not None and len(entries) < self.max_depth:
+            code = frame.f_code
+            entries.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(entries))
@@ -0,0 +1,193 @@
+"""Cache of serialized /analyze responses
+
+Popular songs get pasted again and again. ResponseCache keeps the finished
+JSON bytes of each analysis, keyed by a hash of the normalized text and the
+threshold, so a repeat paste is answered without extracting, grouping,
+scoring or serializing anything.
+
+Responses live in an in-memory LRU bounded by total bytes. An optional
+SQLite file adds a larger second tier that survives restarts and is shared
+by every worker process pointed at it; disk hits are copied back into
+memory. Like the lyrics cache, the file is opened on first use and a forked
+child opens its own connection. If the file can't be opened or used, the
+error is reported once and the cache carries on in memory only, so a bad
+path never fails an analysis.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import weakref
+from collections import OrderedDict
+
+def normalize_text(text):
+    """Canonical form of pasted text: NFC, \\n line endings, no trailing spaces on lines"""
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    return '\n'.join(line.rstrip() for line in text.split('\n'))
+
+def response_key(text, threshold, namespace=''):
+    """Cache key for normalized text analyzed at a threshold"""
+    digest = hashlib.sha256()
+    digest.update(f"{namespace}\0{round(threshold, 6)!r}\0".encode('utf-8'))
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+class ResponseCache:
+    """Serialized responses in a byte-bounded memory LRU, with an optional SQLite tier"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, path=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.path = path
+        self._entries = OrderedDict()  # key -> bytes, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+        self._conn = None
+        self._inherited = []  # parents' connections, kept open so a child never closes them
+
+        this = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: this() and this()._after_fork())
+
+    def get(self, key):
+        """Serialized response for a key, or None"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+
+            try:
+                conn = self._connection()
+                row = None
+                if conn is not None:
+                    row = conn.execute('SELECT body FROM responses WHERE response_key = ?', (key,)).fetchone()
+                if row is not None:
+                    conn.execute('UPDATE responses SET accessed_at = ? WHERE response_key = ?',
+                                 (time.time(), key))
+                    conn.commit()
+                    body = bytes(row[0])
+                    self._remember(key, body)
+                    self.disk_hits += 1
+                    return body
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, body):
+        """Store a serialized response in memory and, if configured, on disk"""
+        with self._lock:
+            self._remember(key, body)
+            if len(body) > self.max_disk_bytes:
+                return
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO responses (response_key, body, size, accessed_at) VALUES (?, ?, ?, ?)',
+                        (key, body, len(body), time.time())
+                    )
+                    self._evict_disk()
+                    conn.commit()
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+
+    def stats(self):
+        """Hit counts and sizes for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
+            try:
+                conn = self._connection()
+                if conn is not None:
+                    count, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+                    stats.update(disk_entries=count, disk_bytes=size, max_disk_bytes=self.max_disk_bytes)
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self):
+        """This process's connection to the disk tier, opened on first use; None without one (caller holds the lock)"""
+        if self._conn is None and self.path:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    response_key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+            ''')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disable_disk(self, error):
+        """Report a disk tier failure once and keep serving from memory (caller holds the lock)"""
+        print(f"⚠ Warning: Response cache at {self.path} failed, continuing in memory only: {error}")
+        self.path = None
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _after_fork(self):
+        # The lock may have been held by a thread that doesn't exist in the child
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            self._inherited.append(self._conn)
+            self._conn = None
+
+    def _remember(self, key, body):
+        """Add to the memory tier, evicting least recently used entries (caller holds the lock)"""
+        if len(body) > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = body
+        self._size += len(body)
+
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _evict_disk(self):
+        """Drop least recently used rows until the file is within max_disk_bytes (caller holds the lock)"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+
+        evict = []
+        for key, size in self._conn.execute('SELECT response_key, size FROM responses ORDER BY accessed_at ASC'):
+            if total <= self.max_disk_bytes:
+                break
+            evict.append((key,))
+            total -= size
+        self._conn.executemany('DELETE FROM responses WHERE response_key = ?', evict)
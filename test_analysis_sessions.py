@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test incremental re-analysis sessions against full /analyze results"""
+
+import sys
+import os
+import json
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, analysis_sessions, find_all_rhymes, sensitivity_to_threshold, AnalysisSessions, RhymeEdges, group_rhyme_words, extract_words
+from benchmark_grouping import synthetic_lyrics
+
+def full_analysis(lines, sensitivity=70):
+    return json.loads(json.dumps(find_all_rhymes('\n'.join(lines), sensitivity_to_threshold(sensitivity))))
+
+def session_analysis(response):
+    data = response.get_json()
+    data.pop('session_id')
+    data.pop('version')
+    return data
+
+def test_analysis_sessions():
+    print("=== TESTING INCREMENTAL ANALYSIS SESSIONS ===\n")
+    client = app.test_client()
+    rng = random.Random(12)
+
+    lines = synthetic_lyrics(400, vocabulary_size=300, words_per_line=8).split('\n')
+    response = client.post('/analyze-session', json={'text': '\n'.join(lines), 'sensitivity': 70})
+    session_id = response.get_json()['session_id']
+    print(f"1. Created session over {len(lines)} lines")
+    assert response.status_code == 200
+    assert session_analysis(response) == full_analysis(lines)
+
+    print("\n2. Random line edits match a full re-analysis:")
+    version = 0
+    for step in range(30):
+        start = rng.randrange(len(lines) + 1)
+        delete = rng.randrange(min(3, len(lines) - start) + 1)
+        new_lines = rng.choice(lines).split()[::-1], rng.choice(lines).split()
+        new_lines = [' '.join(words) for words in new_lines[:rng.randrange(3)]]
+        sensitivity = rng.choice([30, 70, 100])
+
+        lines[start:start + delete] = new_lines
+        response = client.patch(f'/analyze-session/{session_id}', json={
+            'changes': [{'start': start, 'delete': delete, 'lines': new_lines}],
+            'sensitivity': sensitivity
+        })
+        version += bool(delete or new_lines)  # an empty change is not an edit
+        assert response.status_code == 200
+        assert response.get_json()['version'] == version
+        assert session_analysis(response) == full_analysis(lines, sensitivity), f"mismatch at edit {step}"
+    print(f"  30 edits OK, document now {len(lines)} lines")
+
+    print("\n3. Stale versions, bad edits and unknown sessions are rejected:")
+    response = client.patch(f'/analyze-session/{session_id}', json={'base_version': 0, 'changes': []})
+    assert response.status_code == 409 and response.get_json()['version'] == version
+    response = client.patch(f'/analyze-session/{session_id}',
+                            json={'changes': [{'start': 0, 'delete': 0, 'lines': ['ok']},
+                                              {'start': len(lines) + 5, 'delete': 1, 'lines': []}]})
+    assert response.status_code == 400
+    response = client.patch(f'/analyze-session/{session_id}', json={'changes': [], 'sensitivity': 100})
+    assert session_analysis(response) == full_analysis(lines, 100), "failed edit must not change the document"
+    assert client.delete(f'/analyze-session/{session_id}').status_code == 200
+    assert client.patch(f'/analyze-session/{session_id}', json={'changes': []}).status_code == 404
+    print("  409 / 400 / 404 as expected")
+
+    print("\n4. Slider moves regroup from pairs scored once:")
+    text = synthetic_lyrics(1500, vocabulary_size=700)
+    words = extract_words(text.split('\n'))
+    edges = RhymeEdges(words)
+    for sensitivity in range(0, 101, 10):
+        threshold = sensitivity_to_threshold(sensitivity)
+        assert list(edges.groups(threshold)) == list(group_rhyme_words(words, threshold))
+
+    response = client.post('/analyze-session', json={'text': text, 'sensitivity': 70})
+    session_id = response.get_json()['session_id']
+    for sensitivity in (60, 85, 20, 100, 60):
+        response = client.patch(f'/analyze-session/{session_id}', json={'changes': [], 'sensitivity': sensitivity})
+        assert session_analysis(response) == full_analysis(text.split('\n'), sensitivity)
+
+    # The UI's diff of unchanged text is an empty change: no new version, pairs not rescored
+    document = analysis_sessions.get(session_id)
+    edges, version = document._edges, document.version
+    line_count = len(text.split('\n'))
+    response = client.patch(f'/analyze-session/{session_id}',
+                            json={'base_version': version, 'sensitivity': 30,
+                                  'changes': [{'start': line_count, 'delete': 0, 'lines': []}]})
+    assert response.get_json()['version'] == version and document._edges is edges
+    assert session_analysis(response) == full_analysis(text.split('\n'), 30)
+    response = client.patch(f'/analyze-session/{session_id}',
+                            json={'changes': [{'start': 0, 'delete': 1, 'lines': ['the cat sat on the mat']}],
+                                  'sensitivity': 40})
+    assert session_analysis(response) == full_analysis(['the cat sat on the mat'] + text.split('\n')[1:], 40)
+    print("  regrouping OK")
+
+    print("\n5. Sessions expire and are evicted least recently used first:")
+    sessions = AnalysisSessions(max_sessions=2, ttl=60)
+    first, _ = sessions.create('cat hat', 0.7)
+    second, _ = sessions.create('dog log', 0.7)
+    sessions.get(first)
+    third, _ = sessions.create('sun fun', 0.7)
+    assert sessions.get(second) is None and sessions.get(first) and sessions.get(third)
+    sessions.ttl = -1
+    assert sessions.get(first) is None
+    print("  eviction OK")
+
+if __name__ == "__main__":
+    test_analysis_sessions()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test that /analyze-stream reassembles into the /analyze response"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, find_all_rhymes, sensitivity_to_threshold
+from benchmark_grouping import synthetic_lyrics
+
+def reassemble(messages):
+    """Rebuild the /analyze response shape from streamed messages"""
+    groups = [m['group'] for m in messages if m['event'] == 'group']
+    highlights = {}
+    for message in messages:
+        highlights.update(message.get('syllable_highlights', {}))
+
+    return {
+        'lines': messages[0]['lines'],
+        'groups': groups,
+        'rhyme_groups': {group['letter']: group for group in groups},
+        'scheme': messages[1]['scheme'],
+        'syllable_highlights': highlights,
+        'score': messages[-1]['score']
+    }
+
+def time_to_first_group(client, text):
+    start = time.perf_counter()
+    response = client.post('/analyze-stream', json={'text': text}, buffered=False)
+    for chunk in response.response:
+        if json.loads(chunk)['event'] == 'group':
+            elapsed = time.perf_counter() - start
+            response.close()
+            return elapsed
+    return None
+
+def test_analysis_stream():
+    print("=== TESTING STREAMING ANALYSIS ===\n")
+    client = app.test_client()
+
+    print("1. Streamed messages rebuild the /analyze response:")
+    texts = [
+        "I'm tripping and dripping\nThe beat is so sweet",
+        "Cat in the hat\nSat on the mat\nDog in the fog\nLog by the bog",
+        synthetic_lyrics(800, vocabulary_size=400)
+    ]
+    for text in texts:
+        for sensitivity in (20, 70, 100):
+            response = client.post('/analyze-stream', json={'text': text, 'sensitivity': sensitivity})
+            assert response.mimetype == 'application/x-ndjson'
+
+            messages = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert messages[0]['event'] == 'lines' and messages[-1]['event'] == 'score'
+            assert messages[1]['event'] == 'scheme'
+            assert all(m['event'] == 'group' for m in messages[2:-1])
+
+            expected = json.loads(json.dumps(find_all_rhymes(text, sensitivity_to_threshold(sensitivity))))
+            assert reassemble(messages) == expected
+    print("  OK")
+
+    print("\n2. Empty text and non-object bodies are rejected before streaming:")
+    for body in ({'text': ''}, ['cat', 'hat'], 'cat hat', 42, None):
+        response = client.post('/analyze-stream', json=body)
+        print(f"  {json.dumps(body)}: status {response.status_code}")
+        assert response.status_code == 400 and response.get_json() == {'error': 'No text provided'}
+    response = client.post('/analyze-stream', data='{not json', content_type='application/json')
+    assert response.status_code == 400
+
+    print("\n3. CRLF and trailing-space input matches /analyze and /analyze-batch:")
+    text = "Cat in the hat  \r\nSat on the mat\r\nDog in the fog \r\n"
+    analyzed = client.post('/analyze', json={'text': text}).get_json()
+    streamed = client.post('/analyze-stream', json={'text': text}).get_data(as_text=True)
+    batched = client.post('/analyze-batch', json=[{'text': text}]).get_json()[0]
+    assert reassemble([json.loads(line) for line in streamed.splitlines()]) == analyzed == batched
+    assert analyzed['lines'] == ['Cat in the hat', 'Sat on the mat', 'Dog in the fog', '']
+    print("  OK")
+
+    print("\n4. Time to first group:")
+    for words in (1000, 16000):
+        elapsed = time_to_first_group(client, synthetic_lyrics(words))
+        print(f"  {words:>6} words: {elapsed * 1000:.1f}ms")
+        assert elapsed is not None
+
+if __name__ == "__main__":
+    test_analysis_stream()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Test /analyze-batch against per-text /analyze results"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from benchmark_grouping import synthetic_lyrics
+
+def test_analyze_batch():
+    print("=== TESTING BATCH ANALYSIS ===\n")
+    client = app.test_client()
+
+    print("1. Each result matches /analyze on the same text:")
+    items = [
+        {'text': synthetic_lyrics(300, vocabulary_size=200), 'sensitivity': 70},
+        {'text': "chickens in the coop\nrunning in a loop", 'sensitivity': 100},
+        # Same clean word as "coop", but the compound is pronounced from its parts
+        {'text': "we run a co-op\nall the way to the top", 'sensitivity': 100},
+        {'text': synthetic_lyrics(300, vocabulary_size=200, seed=5), 'sensitivity': 30},
+    ]
+    response = client.post('/analyze-batch', json={'items': items})
+    assert response.status_code == 200
+    results = response.get_json()
+    for item, result in zip(items, results):
+        assert result == client.post('/analyze', json=item).get_json()
+    co_op = next([w['original'] for w in group['words']] for group in results[2]['groups']
+                 if 'co-op' in [w['original'] for w in group['words']])
+    print(f"  {len(results)} results OK, co-op group: {co_op}")
+    assert 'top' in co_op
+
+    print("\n2. A bare list works, and bad items get their own error:")
+    response = client.post('/analyze-batch', json=[{'text': 'cat hat'}, {'text': ''}, 'nope'])
+    results = response.get_json()
+    assert response.status_code == 200 and 'groups' in results[0]
+    assert results[1] == results[2] == {'error': 'No text provided'}
+
+    print("\n3. Empty, malformed and oversized batches are rejected:")
+    for body in ([], {'items': []}, {'items': 'cat hat'}, {'text': 'cat hat'}):
+        assert client.post('/analyze-batch', json=body).status_code == 400
+    limit = app_module.MAX_BATCH_ITEMS
+    app_module.MAX_BATCH_ITEMS = 2
+    try:
+        assert client.post('/analyze-batch', json=[{'text': 'a b'}] * 3).status_code == 413
+    finally:
+        app_module.MAX_BATCH_ITEMS = limit
+    print("  400 / 413 as expected")
+
+if __name__ == "__main__":
+    test_analyze_batch()
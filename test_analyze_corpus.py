@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test corpus analysis over directories and JSONL files"""
+
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from analyze_corpus import analyze_corpus
+
+def run_corpus(source, **options):
+    output, errors = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stderr(errors):
+        count = analyze_corpus(source, output, workers=2, **options)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert count == len(results)
+    return {result['id']: result for result in results}, errors.getvalue()
+
+def test_analyze_corpus():
+    print("=== TESTING CORPUS ANALYSIS ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print("1. A directory of .txt files, nested folders included:")
+        os.makedirs(os.path.join(tmp, 'lyrics', 'album'))
+        with open(os.path.join(tmp, 'lyrics', 'cat.txt'), 'w', encoding='utf-8') as f:
+            f.write("the cat in the hat\nsat on a mat")
+        with open(os.path.join(tmp, 'lyrics', 'album', 'dog.txt'), 'w', encoding='utf-8') as f:
+            f.write("a dog on a log\nlost in the fog")
+        with open(os.path.join(tmp, 'lyrics', 'notes.md'), 'w', encoding='utf-8') as f:
+            f.write("not lyrics")
+
+        results, _ = run_corpus(os.path.join(tmp, 'lyrics'))
+        print(f"  {sorted(results)}")
+        assert sorted(results) == ['album/dog.txt', 'cat.txt']
+        assert {'cat', 'hat', 'mat'} <= set(results['cat.txt']['groups'][0]['words'])
+
+        print("\n2. JSONL records, skipping malformed lines with a warning:")
+        path = os.path.join(tmp, 'songs.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join([
+                json.dumps({'id': 'cat', 'text': "the cat in the hat\nsat on a mat", 'sensitivity': 90}),
+                '{"id": "broken", "text": ',
+                '',
+                json.dumps(['not', 'an', 'object']),
+                json.dumps({'lyrics': "a dog on a log\nlost in the fog"}),
+                json.dumps({'id': 'number', 'text': 42}),
+                json.dumps({'id': 'empty', 'text': '   '}),
+            ]) + '\n')
+
+        results, warnings = run_corpus(path, full=True)
+        print('  ' + warnings.strip().replace('\n', '\n  '))
+        assert sorted(results, key=str) == [5, 'cat', 'empty']
+        assert results['cat']['groups'] and 'score' in results['cat'] and 'lines' in results['cat']
+        assert results[5]['groups'] and results['empty'] == {'id': 'empty', 'error': 'No text provided'}
+        for line_number in (2, 4, 6):
+            assert f"Skipping line {line_number} of {path}" in warnings
+        assert warnings.count('Skipping') == 3
+
+if __name__ == "__main__":
+    test_analyze_corpus()
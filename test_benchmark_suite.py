@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Test the benchmark suite's results and baseline comparison"""
+
+import sys
+import os
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_suite import run_suite, compare, repeat_to_size, fixture_lyrics, pipeline_benchmarks
+from benchmark_grouping import synthetic_lyrics
+import app
+
+def test_benchmark_suite():
+    print("=== TESTING BENCHMARK SUITE ===\n")
+
+    print("1. Fixture lyrics are cycled to the requested size:")
+    text = repeat_to_size(fixture_lyrics(), 300)
+    print(f"  {len(text.split())} words")
+    assert 300 <= len(text.split()) < 340
+
+    print("\n2. Every function is measured on every case, as JSON:")
+    results = json.loads(json.dumps(run_suite(sizes=[60], repeat=1)))
+    cases = {r['case'] for r in results['results']}
+    names = {r['name'] for r in results['results']}
+    assert cases == {'synthetic-60', 'fixture-60'}
+    assert names == {'clean_word', 'phonetic_similarity', 'find_all_rhymes',
+                     'calculate_rhyme_score', 'create_syllable_highlights'}
+    assert all(r['median_s'] > 0 and r['peak_bytes'] > 0 for r in results['results'])
+
+    print("\n3. Every timed find_all_rhymes run scores its pairs from cold caches:")
+    run = dict(pipeline_benchmarks(synthetic_lyrics(300, vocabulary_size=150), 0.7))['find_all_rhymes']
+    run()
+    first = app.cached_phonetic_similarity.cache_info()
+    run()
+    # Warm runs would only add hits
+    assert app.cached_phonetic_similarity.cache_info() == first and first.misses > 0
+
+    print("\n4. Slowdowns beyond the tolerance are flagged:")
+    faster_baseline = {'results': [{**r, 'median_s': r['median_s'] / 2} for r in results['results']]}
+    assert all(c['regressed'] for c in compare(results, faster_baseline, tolerance=1.5))
+    assert not any(c['regressed'] for c in compare(results, results, tolerance=1.2))
+
+if __name__ == "__main__":
+    test_benchmark_suite()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test bulk lyrics fetching with a stubbed Genius lookup"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bulk_fetch
+from bulk_fetch import RateLimiter, fetch_lyrics_bulk, fetch_and_analyze
+from lyrics_cache import LyricsCache
+
+LYRICS = "I got the cat in the hat\nand the bat on the mat"
+
+class StubLookup:
+    """Stands in for app.lookup_lyrics, recording calls and the most lookups in flight"""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.calls = []
+        self.active = self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, artist, song):
+        with self.lock:
+            self.calls.append((artist, song))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return {'success': True, 'lyrics': LYRICS, 'artist': artist, 'song': song, 'genius_id': hash(song)}, 200
+
+async def collect(records):
+    return [record async for record in records]
+
+def test_bulk_fetch():
+    print("=== TESTING BULK FETCH ===\n")
+    lookup, cache = bulk_fetch.app.lookup_lyrics, bulk_fetch.app.lyrics_cache
+    stub = StubLookup()
+    bulk_fetch.app.lookup_lyrics = stub
+    bulk_fetch.app.lyrics_cache = None
+
+    try:
+        print("1. The rate limiter spaces request starts:")
+        async def starts(rate, count):
+            limiter = RateLimiter(rate)
+            start = time.perf_counter()
+            await asyncio.gather(*(limiter.wait() for _ in range(count)))
+            return time.perf_counter() - start
+        elapsed = asyncio.run(starts(50, 6))
+        print(f"  6 starts at 50/s took {elapsed * 1000:.0f}ms")
+        assert elapsed >= 0.09
+        assert asyncio.run(starts(0, 100)) < 0.05
+
+        print("\n2. Only a bounded window of lookups is in flight:")
+        pulled = []
+        def pairs():
+            for i in range(40):
+                pulled.append(i)
+                yield 'Artist', f'song {i}'
+
+        async def first_then_rest():
+            records = fetch_lyrics_bulk(pairs(), concurrency=2, rate=0)
+            first = await records.__anext__()
+            pulled_at_first = len(pulled)
+            return [first] + await collect(records), pulled_at_first
+
+        records, pulled_at_first = asyncio.run(first_then_rest())
+        print(f"  {pulled_at_first} pairs read before the first result, at most {stub.max_active} lookups at once")
+        assert pulled_at_first <= 2 * 4 and stub.max_active <= 2
+        assert sorted(r['query']['song'] for r in records) == sorted(f'song {i}' for i in range(40))
+        assert all(r['status'] == 200 and 'cached' not in r for r in records)
+
+        print("\n3. Cached songs skip the lookup:")
+        with tempfile.TemporaryDirectory() as tmp:
+            bulk_fetch.app.lyrics_cache = LyricsCache(os.path.join(tmp, 'cache.sqlite3'))
+            bulk_fetch.app.lyrics_cache.put('Artist', 'Cached', {'success': True, 'lyrics': LYRICS, 'genius_id': 7})
+            stub.calls.clear()
+            records = asyncio.run(collect(fetch_lyrics_bulk([('artist', 'cached!'), ('Artist', 'new')], rate=1)))
+            by_song = {r['query']['song']: r for r in records}
+            assert by_song['cached!']['cached'] and by_song['cached!']['genius_id'] == 7
+            assert stub.calls == [('Artist', 'new')]
+            bulk_fetch.app.lyrics_cache.close()
+            bulk_fetch.app.lyrics_cache = None
+
+        print("\n4. Fetched lyrics are analyzed in spawned worker processes:")
+        records = asyncio.run(collect(fetch_and_analyze([('Artist', 'one'), ('Artist', 'two')], rate=0, workers=1)))
+        assert len(records) == 2
+        for record in records:
+            assert record['analysis']['groups'] and 'id' not in record['analysis']
+        print(f"  {[r['analysis']['groups'][0]['words'] for r in records]}")
+    finally:
+        bulk_fetch.app.lookup_lyrics, bulk_fetch.app.lyrics_cache = lookup, cache
+
+if __name__ == "__main__":
+    test_bulk_fetch()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test the similarity cache counters reported by /cache-stats"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, phonetic_similarity, find_all_rhymes, similarity_cache_stats
+from benchmark_grouping import synthetic_lyrics
+from response_cache import ResponseCache
+
+CACHES = {'phonetic_similarity', 'rhyming_part', 'rhyming_words', 'rhyme_phonemes',
+          'encoded_rhymes', 'letter_to_sound', 'compounds'}
+
+def test_cache_stats():
+    print("=== TESTING CACHE STATS ===\n")
+    client = app.test_client()
+    for cached in (app_module.cached_phonetic_similarity, app_module.get_rhyming_part, app_module.encode_rhyme):
+        cached.cache_clear()
+
+    print("1. Pairs share one entry whichever order they are scored in:")
+    phonetic_similarity('K AE1 T', 'HH AE1 T')
+    phonetic_similarity('HH AE1 T', 'K AE1 T')
+    stats = similarity_cache_stats()['phonetic_similarity']
+    print(f"  {stats}")
+    assert (stats['hits'], stats['misses'], stats['size'], stats['hit_rate']) == (1, 1, 1, 0.5)
+
+    print("\n2. A repeat analysis is answered from the caches:")
+    text = synthetic_lyrics(400, vocabulary_size=200)
+    find_all_rhymes(text)
+    first = similarity_cache_stats()
+    find_all_rhymes(text)
+    second = similarity_cache_stats()
+    for name in ('phonetic_similarity', 'rhyming_part', 'encoded_rhymes'):
+        assert second[name]['misses'] == first[name]['misses'] > 0, name
+        assert second[name]['hits'] > first[name]['hits'], name
+
+    print("\n3. /cache-stats reports every cache, with the response cache when enabled:")
+    response_cache = app_module.response_cache
+    try:
+        app_module.response_cache = None
+        stats = client.get('/cache-stats').get_json()
+        assert set(stats) == CACHES
+        for name, cache in stats.items():
+            lookups = cache['hits'] + cache['misses']
+            assert cache['size'] <= cache['max_size'], name
+            assert cache['hit_rate'] == (round(cache['hits'] / lookups, 3) if lookups else 0.0), name
+
+        app_module.response_cache = ResponseCache()
+        client.post('/analyze', json={'text': 'cat in a hat'})
+        client.post('/analyze', json={'text': 'cat in a hat'})
+        responses = client.get('/cache-stats').get_json()['responses']
+        print(f"  {responses}")
+        assert (responses['hits'], responses['misses'], responses['entries']) == (1, 1, 1)
+    finally:
+        app_module.response_cache = response_cache
+
+if __name__ == "__main__":
+    test_cache_stats()
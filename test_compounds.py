@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test pronunciations for hyphenated and multi-word compound tokens"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import (clean_word, compound_parts, lookup_word_phones, compound_phones, find_all_rhymes, find_rhyme_scheme,
+                 extract_words, group_rhyme_words, group_by_similarity_matrix, RhymeEdges)
+
+def test_compounds():
+    print("=== TESTING COMPOUND PRONUNCIATIONS ===\n")
+
+    print("1. Compounds keep every part:")
+    assert compound_parts("Bench-Pressed,") == ['bench', 'pressed']
+    assert compound_parts("crow's nest") == ['crows', 'nest']
+    assert clean_word("bench-pressed") == 'benchpressed'
+    assert clean_word("well-") == 'well' and clean_word("--") == ''
+    for token in ("bench-pressed", "key west", "x-ray", "mae-west!"):
+        print(f"  {token:14} -> {lookup_word_phones(token, clean_word(token))}")
+
+    print("\n2. Unlisted compounds join their parts' pronunciations:")
+    assert lookup_word_phones("bench-pressed", "benchpressed") == 'B EH1 N CH P R EH1 S T'
+    # The last part keeps its primary stress, even where CMU lists the compound
+    assert lookup_word_phones("x-ray", "xray") == 'EH1 K S R EY1'
+    assert lookup_word_phones("hard-pressed", "hardpressed") == 'HH AA1 R D P R EH1 S T'
+    assert lookup_word_phones("24-7", "247") is None
+
+    print("\n3. Compounds rhyme on their full ending, and repeats hit the cache:")
+    analysis = find_all_rhymes("I bench-pressed\nthe hard-pressed\nand got dressed")
+    words = [(w['clean'], w.get('match')) for w in analysis['groups'][0]['words']]
+    print(f"  {words}")
+    assert words[:2] == [('benchpressed', None), ('hardpressed', 'exact')]
+
+    print("\n4. A compound rhymes with a simple word ending the same way:")
+    text = "I got dressed\nthen I bench-pressed"
+    groups = find_all_rhymes(text, 0.95)['groups']
+    assert [(w['clean'], w.get('match')) for w in groups[0]['words']] == [('dressed', None), ('benchpressed', 'exact')]
+    assert find_rhyme_scheme(text)['scheme'] == ['A', 'A']
+
+    print("\n5. A compound and its joined spelling are grouped apart:")
+    text = "we run a co-op\nall the way to the top\nchickens in the coop\nrunning in a loop"
+    groups = [[w['original'] for w in group['words']] for group in find_all_rhymes(text, 0.95)['groups']]
+    print(f"  {groups}")
+    assert ['co-op', 'top'] in groups and ['coop', 'loop'] in groups
+    assert find_rhyme_scheme(text)['scheme'] == ['A', 'A', 'B', 'B']
+    all_words = extract_words(text.split('\n'))
+    for threshold in (0.4, 0.7, 0.95):
+        expected = list(group_rhyme_words(all_words, threshold))
+        assert list(group_by_similarity_matrix(all_words, threshold)) == expected
+        assert list(RhymeEdges(all_words).groups(threshold)) == expected
+
+    hits = compound_phones.cache_info().hits
+    find_all_rhymes("bench-pressed again")
+    assert compound_phones.cache_info().hits > hits
+
+if __name__ == "__main__":
+    test_compounds()
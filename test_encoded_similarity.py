@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test encoded-phoneme similarity scores against the original string-based scoring"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pronouncing
+from app import phonetic_similarity, calculate_enhanced_phonetic_similarity, last_vowel_sound, VOWEL_PHONEMES, are_similar_vowels
+
+def reference_similarity(phones1, phones2):
+    """Score a pair the way phonetic_similarity did before phonemes were encoded"""
+    rhyme1, rhyme2 = pronouncing.rhyming_part(phones1), pronouncing.rhyming_part(phones2)
+    if not rhyme1 or not rhyme2:
+        return 0.0
+    if rhyme1 == rhyme2:
+        return 1.0
+    return reference_enhanced_similarity(rhyme1.split(), rhyme2.split())
+
+def reference_enhanced_similarity(phonemes1, phonemes2):
+    vowels1 = [p for p in phonemes1 if any(p.startswith(v) for v in VOWEL_PHONEMES)]
+    vowels2 = [p for p in phonemes2 if any(p.startswith(v) for v in VOWEL_PHONEMES)]
+    if not vowels1 or not vowels2:
+        return 0.0
+
+    clean_vowel1 = ''.join(c for c in vowels1[-1] if c.isalpha())
+    clean_vowel2 = ''.join(c for c in vowels2[-1] if c.isalpha())
+    if clean_vowel1 == clean_vowel2:
+        vowel_score = 1.0
+    elif are_similar_vowels(clean_vowel1, clean_vowel2):
+        vowel_score = 0.7
+    else:
+        return 0.0
+
+    min_len = min(len(phonemes1), len(phonemes2))
+    max_len = max(len(phonemes1), len(phonemes2))
+    matching_from_end = 0
+    for i in range(min_len):
+        if phonemes1[-(i + 1)] != phonemes2[-(i + 1)]:
+            break
+        matching_from_end += 1
+
+    ending_score = 0.0
+    if matching_from_end >= 2:
+        ending_score = matching_from_end / max_len
+    elif matching_from_end == 1 and min_len <= 2:
+        ending_score = 0.5
+
+    consonant_score = reference_consonant_similarity(phonemes1, phonemes2)
+    length_penalty = 0.5 if max_len > min_len * 2 else 1.0
+    return min((vowel_score * 0.5 + ending_score * 0.3 + consonant_score * 0.2) * length_penalty, 1.0)
+
+def reference_consonant_similarity(phonemes1, phonemes2):
+    def last_vowel_pos(phonemes):
+        positions = [i for i, p in enumerate(phonemes) if any(p.startswith(v) for v in VOWEL_PHONEMES)]
+        return positions[-1] if positions else -1
+
+    pos1, pos2 = last_vowel_pos(phonemes1), last_vowel_pos(phonemes2)
+    if pos1 == -1 or pos2 == -1:
+        return 0.0
+    consonants1, consonants2 = phonemes1[pos1 + 1:], phonemes2[pos2 + 1:]
+    if not consonants1 and not consonants2:
+        return 1.0
+    if not consonants1 or not consonants2:
+        return 0.3
+    matches = sum(1 for c1, c2 in zip(consonants1, consonants2) if c1 == c2)
+    return matches / max(len(consonants1), len(consonants2))
+
+def test_encoded_similarity():
+    print("=== TESTING ENCODED SIMILARITY ===\n")
+    pronouncing.init_cmu()
+    rng = random.Random(4)
+    pronunciations = sorted({phones for _, phones in pronouncing.pronunciations})
+
+    # Uniform pairs mostly score 0, so half the pairs share (or nearly share) a last vowel
+    by_vowel = {}
+    for phones in pronunciations:
+        by_vowel.setdefault(last_vowel_sound(phones), []).append(phones)
+    pairs = [tuple(rng.sample(pronunciations, 2)) for _ in range(5000)]
+    for _ in range(5000):
+        bucket = by_vowel[rng.choice(sorted(by_vowel, key=str))]
+        pairs.append((rng.choice(bucket), rng.choice(bucket)))
+
+    print(f"1. {len(pairs)} random CMU pairs score exactly as before encoding:")
+    nonzero = 0
+    for phones1, phones2 in pairs:
+        expected = reference_similarity(phones1, phones2)
+        assert phonetic_similarity(phones1, phones2) == expected, (phones1, phones2)
+        assert phonetic_similarity(phones2, phones1) == expected, (phones2, phones1)
+        nonzero += expected > 0
+    print(f"  {nonzero} pairs with a nonzero score")
+    assert nonzero > 2000
+
+    print("\n2. Phoneme lists are scored the same way:")
+    for phones1, phones2 in pairs[:500]:
+        phonemes1, phonemes2 = phones1.split()[-4:], phones2.split()[-4:]
+        assert calculate_enhanced_phonetic_similarity(phonemes1, phonemes2) == \
+            reference_enhanced_similarity(phonemes1, phonemes2)
+
+if __name__ == "__main__":
+    test_encoded_similarity()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test the pooled HTTP client against a local stub server"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from http_pool import PooledHTTPClient
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        stats = self.server.stats
+        with stats['lock']:
+            stats['connections'].add(self.client_address)
+            stats['active'] += 1
+            stats['max_active'] = max(stats['max_active'], stats['active'])
+            stats['hits'][self.path] = stats['hits'].get(self.path, 0) + 1
+            hits = stats['hits'][self.path]
+
+        try:
+            if self.path == '/slow':
+                time.sleep(0.05)
+            if self.path == '/flaky' and hits <= 2:
+                self.reply(503 if hits == 1 else 429, b'busy', {'Retry-After': '0'})
+            else:
+                self.reply(200, b'ok')
+        finally:
+            with stats['lock']:
+                stats['active'] -= 1
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.stats = {'lock': threading.Lock(), 'connections': set(), 'active': 0, 'max_active': 0, 'hits': {}}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+def test_http_pool():
+    print("=== TESTING POOLED HTTP CLIENT ===\n")
+    server, base_url = start_stub_server()
+    client = PooledHTTPClient(pool_size=4, max_retries=3, backoff_factor=0.01, per_host_limit=2)
+
+    try:
+        print("1. Sequential requests reuse one connection:")
+        for _ in range(5):
+            assert client.get(f'{base_url}/ok').status_code == 200
+        print(f"  5 requests over {len(server.stats['connections'])} connection(s)")
+        assert len(server.stats['connections']) == 1
+
+        print("\n2. 503 and 429 responses are retried:")
+        response = client.get(f'{base_url}/flaky')
+        print(f"  status {response.status_code} after {server.stats['hits']['/flaky']} attempts")
+        assert response.status_code == 200
+        assert server.stats['hits']['/flaky'] == 3
+
+        print("\n3. Per-host concurrency is capped:")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = list(pool.map(lambda _: client.get(f'{base_url}/slow').status_code, range(8)))
+        print(f"  max concurrent requests seen by server: {server.stats['max_active']}")
+        assert statuses == [200] * 8
+        assert server.stats['max_active'] <= 2
+
+        print("\n4. A streamed response holds its host slot until read or closed:")
+        single = PooledHTTPClient(pool_size=2, per_host_limit=1)
+        try:
+            for finish in (lambda r: r.content, lambda r: list(r.iter_lines()), lambda r: r.close()):
+                streamed = single.get(f'{base_url}/ok', stream=True)
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    waiting = pool.submit(lambda: single.get(f'{base_url}/ok').status_code)
+                    time.sleep(0.1)
+                    assert not waiting.done(), "second request ran while the first body was unread"
+                    finish(streamed)
+                    assert waiting.result(timeout=5) == 200
+                streamed.close()  # releasing again is harmless
+
+            with single.get(f'{base_url}/ok', stream=True) as streamed:
+                assert streamed.status_code == 200
+            assert single.get(f'{base_url}/ok').status_code == 200
+        finally:
+            single.close()
+        print("  slot released after .content, iter_lines() and close()")
+    finally:
+        client.close()
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_http_pool()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Test letter-to-sound pronunciations for words missing from CMU"""
+
+import sys
+import os
+import random
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pronouncing
+from letter_to_sound import guess_pronunciation, ARPABET_VOWELS
+from phonetic_store import rhyming_part
+from app import find_all_rhymes, guess_phones
+
+ARPABET = ARPABET_VOWELS | {
+    'B', 'CH', 'D', 'DH', 'F', 'G', 'HH', 'JH', 'K', 'L', 'M', 'N', 'NG', 'P',
+    'R', 'S', 'SH', 'T', 'TH', 'V', 'W', 'Y', 'Z', 'ZH'
+}
+
+def last_stressed_vowel(phones):
+    return rhyming_part(phones).split()[0].rstrip('012')
+
+def test_letter_to_sound():
+    print("=== TESTING LETTER-TO-SOUND FALLBACK ===\n")
+    pronouncing.init_cmu()
+
+    print("1. Slang, inflections and compounds:")
+    expected = {
+        'trippin': 'T R IH1 P IH0 N',
+        'gangsta': 'G AE1 NG S T AH0',
+        'boyz': 'B OY1 Z',
+        'swordquest': 'S AO1 R D K W EH1 S T',
+        'arzest': 'AA0 R Z EH1 S T',
+    }
+    for word, phones in expected.items():
+        guess = guess_pronunciation(word, pronouncing.phones_for_word)
+        print(f"  {word:12} -> {guess}")
+        assert guess == phones
+    assert guess_pronunciation('2pac', pronouncing.phones_for_word) is None
+
+    print("\n2. Held-out CMU words:")
+    words = sorted(w for w in pronouncing.lookup if re.match('^[a-z]{4,}$', w))
+    sample = random.Random(3).sample(words, 1000)
+    vowel_hits = 0
+    for word in sample:
+        guess = guess_pronunciation(word, lambda w: [] if w == word else pronouncing.phones_for_word(w))
+        assert set(p.rstrip('012') for p in guess.split()) <= ARPABET, guess
+        actual = {last_stressed_vowel(p) for p in pronouncing.phones_for_word(word)}
+        vowel_hits += last_stressed_vowel(guess) in actual
+    print(f"  rhyme vowel right for {vowel_hits / len(sample):.0%} of unseen words")
+    assert vowel_hits / len(sample) > 0.55
+
+    print("\n3. Unknown words now rhyme, and repeats hit the cache:")
+    analysis = find_all_rhymes("I was trippin on the way\nShe was drippin all day\nSkrrt flexin")
+    groups = [[w['clean'] for w in group['words']] for group in analysis['groups']]
+    print(f"  groups: {groups}")
+    trippin_group = next(group for group in analysis['groups'] if group['words'][0]['clean'] == 'trippin')
+    assert [(w['clean'], w['match']) for w in trippin_group['words'][1:2]] == [('drippin', 'exact')]
+    hits = guess_phones.cache_info().hits
+    find_all_rhymes("trippin drippin")
+    assert guess_phones.cache_info().hits >= hits + 2
+
+if __name__ == "__main__":
+    test_letter_to_sound()
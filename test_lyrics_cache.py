@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test the persistent lyrics cache"""
+
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import lyrics_cache
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as app_module
+from lyrics_cache import LyricsCache, DEFAULT_PATH, normalize_query
+
+def song_info(genius_id, title):
+    return {
+        'success': True,
+        'lyrics': f'lyrics for {title}',
+        'artist': 'Artist',
+        'song': title,
+        'url': f'https://genius.com/{genius_id}',
+        'genius_id': genius_id
+    }
+
+def test_lyrics_cache():
+    print("=== TESTING LYRICS CACHE ===\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.sqlite3')
+
+        print("1. Normalized query keys:")
+        assert normalize_query('  Eminem ', 'Lose   Yourself!') == normalize_query('eminem', 'lose yourself')
+        print(f"  {normalize_query('Eminem', 'Lose Yourself!')}")
+
+        print("\n2. Lookups by query and Genius ID survive a reopen:")
+        cache = LyricsCache(path)
+        cache.put('Eminem', 'Lose Yourself', song_info(1, 'Lose Yourself'))
+        cache.close()
+        cache = LyricsCache(path)
+        assert cache.get('eminem', 'lose yourself!')['song'] == 'Lose Yourself'
+        assert cache.get_by_id(1)['genius_id'] == 1
+        cache.link('Slim Shady', 'Lose Yourself', 1)
+        assert cache.get('slim shady', 'lose yourself')['genius_id'] == 1
+        print(f"  {cache.stats()}")
+        cache.close()
+
+        print("\n3. Expired entries are dropped:")
+        cache = LyricsCache(path, ttl=0.05)
+        time.sleep(0.1)
+        assert cache.get('eminem', 'lose yourself') is None
+        assert cache.stats()['songs'] == 0
+        cache.close()
+
+        print("\n4. Least recently used songs are evicted:")
+        cache = LyricsCache(path, max_entries=2, touch_interval=0)
+        cache.put('a', 'one', song_info(10, 'one'))
+        cache.put('a', 'two', song_info(11, 'two'))
+        cache.get('a', 'one')
+        cache.put('a', 'three', song_info(12, 'three'))
+        assert cache.get('a', 'two') is None
+        assert cache.get('a', 'one') and cache.get('a', 'three')
+        print(f"  {cache.stats()}")
+        cache.close()
+
+        print("\n5. The file is opened on first use, and a forked child opens its own:")
+        assert os.path.dirname(DEFAULT_PATH) == os.path.dirname(os.path.abspath(lyrics_cache.__file__))
+        lazy_path = os.path.join(tmp, 'lazy.sqlite3')
+        cache = LyricsCache(lazy_path)
+        assert not os.path.exists(lazy_path)
+        cache.put('a', 'parent', song_info(20, 'parent'))
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                if cache._conn is None and cache.get('a', 'parent')['genius_id'] == 20:
+                    cache.put('a', 'child', song_info(21, 'child'))
+                    status = 0
+            finally:
+                os._exit(status)
+        assert os.waitpid(pid, 0)[1] == 0
+        assert cache.get('a', 'child')['genius_id'] == 21
+        cache.close()
+
+        print("\n6. Repeat hits are read-only until the access time is stale:")
+        cache = LyricsCache(path)
+        cache.put('a', 'hot', song_info(30, 'hot'))
+        writes = cache._conn.total_changes
+        for _ in range(5):
+            assert cache.get('a', 'hot')['genius_id'] == 30
+        assert cache._conn.total_changes == writes
+        cache.touch_interval = 0
+        cache.get('a', 'hot')
+        assert cache._conn.total_changes == writes + 1
+        cache.close()
+
+        print("\n7. A broken cache file falls back to plain Genius lookups:")
+        not_a_database = os.path.join(tmp, 'not_a_database.sqlite3')
+        with open(not_a_database, 'w') as f:
+            f.write('plain text, not SQLite ' * 100)
+        saved = {name: getattr(app_module, name) for name in
+                 ('lyrics_cache', 'genius', 'search_genius', 'find_best_match', 'scrape_genius_lyrics')}
+        hit = {'id': 40, 'title': 'Song', 'url': 'https://genius.com/40', 'primary_artist': {'name': 'Artist'}}
+        output = io.StringIO()
+        try:
+            app_module.lyrics_cache = LyricsCache(not_a_database)
+            app_module.genius = True
+            app_module.search_genius = lambda artist, song: [hit]
+            app_module.find_best_match = lambda hits, artist, song: hits[0]
+            app_module.scrape_genius_lyrics = lambda url: 'the cat in the hat'
+            with contextlib.redirect_stdout(output):
+                for _ in range(2):
+                    response = app_module.app.test_client().post('/search-lyrics', json={'artist': 'Artist', 'song': 'Song'})
+                    assert response.status_code == 200 and response.get_json()['lyrics'] == 'the cat in the hat'
+            assert output.getvalue().count('⚠ Warning') == 1
+            assert app_module.lyrics_cache.stats()['disabled']
+        finally:
+            for name, value in saved.items():
+                setattr(app_module, name, value)
+
+if __name__ == "__main__":
+    test_lyrics_cache()
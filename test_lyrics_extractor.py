@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Check the streaming lyrics extractor against the BeautifulSoup scrape path"""
+
+import sys
+import os
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import extract_lyrics_with_soup
+from lyrics_extractor import extract_lyrics_containers
+
+SNIPPETS = [
+    '<div data-lyrics-container="true">Line &amp; one<br/>two <a href="#"><span>three</span></a> four</div>',
+    '<div data-lyrics-container="true">a<!-- note -->b<script>var x = 1;</script>c<style>.x{}</style>d</div>',
+    '<div data-lyrics-container="true">keep<div class="LyricsHeader__Container">drop</div>'
+    '<div class="InreadAd"><p>drop <b>too</b></p></div>after &#150; dash</div>',
+    '<p>outside</p><div data-lyrics-container="true"><i>first</i></div><div>between</div>'
+    '<div data-lyrics-container="true">second<br>  spaced   <template>hidden</template></div>',
+]
+
+def test_lyrics_extractor():
+    print("=== TESTING STREAMING LYRICS EXTRACTOR ===\n")
+
+    pages = [(f'snippet {i}', html.encode()) for i, html in enumerate(SNIPPETS)]
+    fixture_dir = Path(__file__).parent / 'fixtures' / 'genius'
+    pages += [(path.name, path.read_bytes()) for path in sorted(fixture_dir.glob('*.html'))]
+
+    for name, content in pages:
+        expected = extract_lyrics_with_soup(content)
+        # Feed in small chunks to exercise tags and entities split across reads
+        text = content.decode('utf-8')
+        streamed = extract_lyrics_containers(text[i:i + 7] for i in range(0, len(text), 7))
+
+        if 'data-lyrics-container' in text:
+            print(f"  {name}: {len(streamed or '')} chars")
+            assert streamed == expected, f"{name}: streamed text differs from BeautifulSoup"
+        else:
+            print(f"  {name}: no containers, falls back to selectors")
+            assert streamed is None and expected
+
+if __name__ == "__main__":
+    test_lyrics_extractor()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test stage timing metrics and the /metrics endpoint"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from metrics import Metrics
+from benchmark_grouping import synthetic_lyrics
+
+def sample(text, name):
+    match = re.search(rf'^{re.escape(name)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+def test_metrics():
+    print("=== TESTING METRICS ===\n")
+
+    print("1. Counters and histograms render in Prometheus text format:")
+    metrics = Metrics()
+    metrics.describe('jobs_total', 'counter', 'Jobs run')
+    metrics.count('jobs_total', 2, kind='a')
+    metrics.observe('latency_seconds', 0.003)
+    metrics.observe('latency_seconds', 20)
+    text = metrics.render([('queue_depth', 'gauge', 'Queued jobs', [({}, 4)])])
+    print('  ' + '\n  '.join(text.splitlines()[:6]))
+    assert '# TYPE jobs_total counter' in text and 'jobs_total{kind="a"} 2' in text
+    assert 'latency_seconds_bucket{le="0.005"} 1' in text and 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert sample(text, 'latency_seconds_count') == 2 and sample(text, 'queue_depth') == 4
+
+    print("\n2. Disabled metrics record nothing:")
+    disabled = Metrics(enabled=False)
+    with disabled.request() as current, disabled.stage('grouping'):
+        disabled.count('jobs_total')
+    assert disabled.render() == '\n' and current == {'stages': {}, 'counts': {}}
+
+    print("\n3. Per-call stage time is only kept inside an accumulate() block:")
+    metrics.add_stage_time('lookup', 5.0)  # stray, must not leak into the next block
+    with metrics.request() as current:
+        with metrics.accumulate('lookup', 'lookups_total'):
+            with metrics.accumulate('lookup'):
+                metrics.add_stage_time('lookup', 0.25)
+            metrics.add_stage_time('lookup', 0.25)
+        metrics.add_stage_time('lookup', 5.0)
+    assert current == {'stages': {'lookup': 0.5}, 'counts': {'lookups_total': 2}}
+    assert sample(metrics.render(), 'rhyme_analysis_stage_seconds_count{stage="lookup"}') == 1
+
+    print("\n4. /analyze reports its own stages, and /metrics accumulates them:")
+    client = app.test_client()
+    before = client.get('/metrics').get_data(as_text=True)
+    text = synthetic_lyrics(500, vocabulary_size=300)
+    timings = client.post('/analyze', json={'text': text, 'timings': True}).get_json()['timings']
+    print(f"  {timings}")
+    assert {'extract_words', 'grouping', 'syllable_highlights', 'scoring'} <= set(timings['stages_ms'])
+    assert timings['counts']['rhyme_words_extracted_total'] == 500
+    assert timings['counts']['rhyme_pairs_compared_total'] > 0
+    assert 'timings' not in client.post('/analyze', json={'text': text}).get_json()
+
+    after = client.get('/metrics').get_data(as_text=True)
+    assert after.count('rhyme_analysis_stage_seconds_bucket{stage="grouping"') == 14
+    assert (sample(after, 'rhyme_words_extracted_total') or 0) >= (sample(before, 'rhyme_words_extracted_total') or 0) + 500
+    assert 'rhyme_cache_hits_total{cache="phonetic_similarity"}' in after
+
+    print("\n5. Every lookup and grouping path reports its own work:")
+    with app_module.metrics.request() as current:
+        app_module.find_rhyme_scheme("a brand new rhyme scheme\nplayed on a steam machine")
+    assert current['counts']['rhyme_phone_lookups_total'] == 2 and 'phone_lookup' in current['stages']
+    with app_module.metrics.request() as current:
+        app_module.extract_words(["nothing leaked from the scheme"])
+    assert current['counts']['rhyme_phone_lookups_total'] == 5
+
+    words = app_module.extract_words(synthetic_lyrics(300, vocabulary_size=200).split('\n'))
+    edges = app_module.RhymeEdges(words)
+    for grouping in (lambda: edges.groups(0.7), lambda: app_module.group_by_similarity_matrix(words, 0.7)):
+        with app_module.metrics.request() as current:
+            list(grouping())
+        assert current['counts']['rhyme_pairs_compared_total'] > 0
+
+    print("\n6. /metrics is off when metrics are disabled:")
+    enabled = app_module.metrics
+    app_module.metrics = Metrics(enabled=False)
+    try:
+        assert client.get('/metrics').status_code == 404
+        assert 'timings' not in client.post('/analyze', json={'text': text + ' x', 'timings': True}).get_json()
+    finally:
+        app_module.metrics = enabled
+
+if __name__ == "__main__":
+    test_metrics()
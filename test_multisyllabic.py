@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Test multi-word and internal rhyme detection over vowel n-grams"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, find_multisyllabic_rhymes
+
+VERSE = """His palms are sweaty, knees weak, arms are heavy
+There's vomit on his sweater already, mom's spaghetti"""
+
+def texts(chain):
+    return [o['text'] for o in chain['occurrences']]
+
+def test_multisyllabic():
+    print("=== TESTING MULTISYLLABIC RHYMES ===\n")
+
+    print("1. Chains across word boundaries:")
+    chains = find_multisyllabic_rhymes(VERSE)
+    for chain in chains:
+        print(f"  {chain['vowels']:12} {texts(chain)}")
+    assert any(texts(c) == ['palms are sweaty,', 'arms are heavy'] and c['syllables'] == 4 for c in chains)
+    assert any({'sweaty,', 'heavy', 'spaghetti'} <= set(texts(c)) for c in chains)
+
+    print("\n2. Shorter n-grams inside a reported chain are not repeated:")
+    assert not any(texts(c) == ['are sweaty,', 'are heavy'] for c in chains)
+
+    print("\n3. Repeated phrases are not rhymes, and distant lines don't chain:")
+    assert find_multisyllabic_rhymes("mom's spaghetti\nmom's spaghetti") == []
+    assert find_multisyllabic_rhymes("palms are sweaty\n" + "\n" * 10 + "arms are heavy") == []
+
+    print("\n4. /analyze includes chains only when asked:")
+    client = app.test_client()
+    plain = client.post('/analyze', json={'text': VERSE}).get_json()
+    multi = client.post('/analyze', json={'text': VERSE, 'multisyllabic': True}).get_json()
+    assert 'multisyllabic_rhymes' not in plain
+    assert multi['multisyllabic_rhymes'] == chains
+    assert multi['groups'] == plain['groups']
+
+if __name__ == "__main__":
+    test_multisyllabic()
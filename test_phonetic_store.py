@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Check the prebuilt phonetic store against pronouncing's CMU dictionary"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pronouncing
+from phonetic_store import PhoneticStore, build_store, rhyming_part
+
+def test_phonetic_store():
+    print("=== TESTING PHONETIC STORE ===\n")
+    pronouncing.init_cmu()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'phonetic_store.bin'
+        word_count, pron_count, rhyme_count = build_store(path)
+        print(f"1. Built store: {word_count} words, {pron_count} pronunciations, {rhyme_count} rhyming parts")
+        assert word_count == len(pronouncing.lookup)
+        assert pron_count == len(pronouncing.pronunciations)
+        assert rhyme_count == len(pronouncing.rhyme_lookup)
+
+        start = time.perf_counter()
+        store = PhoneticStore.open(path)
+        print(f"\n2. Mapped in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        print("\n3. Every lookup matches pronouncing:")
+        for word in pronouncing.lookup:
+            assert store.phones_for_word(word) == pronouncing.phones_for_word(word), word
+        for rhyme_part, words in pronouncing.rhyme_lookup.items():
+            assert set(store.words_for_rhyming_part(rhyme_part)) == set(words), rhyme_part
+        assert store.phones_for_word('Tripping') == pronouncing.phones_for_word('tripping')
+        assert store.rhyming_parts_for_word('read') == [pronouncing.rhyming_part(p) for p in pronouncing.phones_for_word('read')]
+        assert store.phones_for_word('qqxzv') == [] and 'qqxzv' not in store
+        assert store.words_for_rhyming_part('ZZ9') == []
+        for word in list(pronouncing.lookup)[::50]:
+            # pronouncing repeats a word once per matching pronunciation
+            assert set(store.rhymes(word)) == set(pronouncing.rhymes(word)), word
+        for word, phones in pronouncing.pronunciations[::20]:
+            assert rhyming_part(phones) == pronouncing.rhyming_part(phones)
+        rhyme_set = store.rhyme_set(rhyming_part(pronouncing.phones_for_word('cat')[0]))
+        assert 'hat' in rhyme_set and 'dog' not in rhyme_set and len(rhyme_set) == len(list(rhyme_set))
+        print("  OK")
+        store.close()
+
+        print("\n4. Corrupt files are rejected:")
+        data = path.read_bytes()
+        for bad in (b'NOTASTORE' + data[9:], data[:len(data) // 2], data[:10]):
+            try:
+                PhoneticStore(bad)
+            except ValueError as e:
+                print(f"  {e}")
+            else:
+                assert False, "corrupt store loaded"
+
+if __name__ == "__main__":
+    test_phonetic_store()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test the slow request profiler"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+from profiler import SlowRequestProfiler
+from benchmark_grouping import synthetic_lyrics
+
+def spin_in_slow_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_profiler():
+    print("=== TESTING SLOW REQUEST PROFILER ===\n")
+
+    print("1. Only requests over budget are kept, with their hot frames:")
+    profiler = SlowRequestProfiler(budget=0.05, interval=0.002, max_profiles=2)
+    with profiler.profile('fast'):
+        pass
+    with profiler.profile('slow', lambda: {'word_count': 42}):
+        spin_in_slow_loop(0.2)
+    dumps = profiler.dumps()
+    print(f"  {dumps[0]['samples']} samples, top frame {dumps[0]['top_frames'][0]['frame']}")
+    assert [d['endpoint'] for d in dumps] == ['slow'] and dumps[0]['word_count'] == 42
+    assert dumps[0]['duration_ms'] >= 200 and dumps[0]['samples'] > 10
+    assert 'spin_in_slow_loop' in dumps[0]['top_frames'][0]['frame']
+    assert dumps[0]['stacks'][0]['stack'].endswith(dumps[0]['top_frames'][0]['frame'])
+
+    print("\n2. The ring buffer keeps the newest dumps:")
+    for name in ('second', 'third'):
+        with profiler.profile(name):
+            spin_in_slow_loop(0.06)
+    assert [d['endpoint'] for d in profiler.dumps()] == ['third', 'second']
+
+    print("\n3. /debug/slow-requests serves /analyze dumps with request details:")
+    client = app.test_client()
+    assert client.get('/debug/slow-requests').status_code == 404
+
+    app_module.slow_request_profiler = SlowRequestProfiler(budget=0, interval=0.001)
+    try:
+        text = synthetic_lyrics(3000, vocabulary_size=1500)
+        client.post('/analyze', json={'text': text, 'sensitivity': 85, 'timings': True})
+        dump = client.get('/debug/slow-requests').get_json()['profiles'][0]
+        print(f"  {dump['duration_ms']}ms, {dump['samples']} samples")
+        assert dump['endpoint'] == 'analyze' and dump['word_count'] == 3000 and dump['sensitivity'] == 85
+        assert dump['samples'] > 0 and any('app.py' in frame['frame'] for frame in dump['top_frames'])
+    finally:
+        app_module.slow_request_profiler = None
+
+if __name__ == "__main__":
+    test_profiler()
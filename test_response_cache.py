@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the /analyze response cache"""
+
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app, find_all_rhymes, sensitivity_to_threshold
+from response_cache import ResponseCache, normalize_text, response_key
+from benchmark_grouping import synthetic_lyrics
+
+def test_response_cache():
+    print("=== TESTING RESPONSE CACHE ===\n")
+
+    print("1. Keys ignore line endings and trailing spaces, but not sensitivity:")
+    assert normalize_text("Cat in the hat  \r\nSat on the mat\r") == "Cat in the hat\nSat on the mat\n"
+    key = response_key(normalize_text("a\r\nb"), 0.7)
+    assert key == response_key("a\nb", 0.7) == response_key("a\nb", 0.7000000001)
+    assert key != response_key("a\nb", 0.64) and key != response_key("a\nb", 0.7, 'other')
+
+    print("\n2. Memory is bounded by bytes, least recently used first:")
+    cache = ResponseCache(max_bytes=250)
+    for name in 'abc':
+        cache.put(name, name.encode() * 100)
+    assert cache.get('a') is None and cache.get('c') == b'c' * 100
+    cache.put('big', b'x' * 300)
+    assert cache.get('big') is None and cache.stats()['bytes'] <= 250
+
+    print("\n3. The disk tier survives a restart and is bounded too:")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'responses.sqlite3')
+        cache = ResponseCache(max_bytes=1000, path=path, max_disk_bytes=250)
+        for name in 'abc':
+            cache.put(name, name.encode() * 100)
+        cache.close()
+        cache = ResponseCache(max_bytes=1000, path=path, max_disk_bytes=250)
+        assert cache.get('a') is None and cache.get('c') == b'c' * 100
+        assert cache.stats()['disk_hits'] == 1 and cache.stats()['disk_bytes'] <= 250
+
+        # A forked worker opens its own connection; the parent reads its write from disk
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                if cache._conn is None:
+                    cache.put('d', b'd' * 10)
+                    status = 0
+            finally:
+                os._exit(status)
+        assert os.waitpid(pid, 0)[1] == 0
+        assert cache.get('d') == b'd' * 10 and cache.stats()['disk_hits'] == 2
+        cache.close()
+
+        # The file is only opened once the disk tier is used
+        lazy_path = os.path.join(tmp, 'lazy.sqlite3')
+        cache = ResponseCache(path=lazy_path)
+        assert not os.path.exists(lazy_path)
+        cache.put('x', b'x')
+        assert os.path.exists(lazy_path)
+        cache.close()
+
+        # A disk tier that can't be used leaves a memory-only cache, reporting the failure once
+        not_a_database = os.path.join(tmp, 'not_a_database.sqlite3')
+        with open(not_a_database, 'w') as f:
+            f.write('plain text, not SQLite ' * 100)
+        for bad_path in ('/nonexistent/dir/cache.sqlite3', not_a_database):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                cache = ResponseCache(path=bad_path)
+                assert cache.get('a') is None
+                cache.put('a', b'a' * 10)
+                assert cache.get('a') == b'a' * 10 and 'disk_entries' not in cache.stats()
+            assert output.getvalue().count('⚠ Warning') == 1, output.getvalue()
+
+    print("\n4. /analyze serves repeats from the cache, byte for byte:")
+    app_module.response_cache = ResponseCache()
+    client = app.test_client()
+    text = synthetic_lyrics(400, vocabulary_size=300)
+
+    start = time.perf_counter()
+    first = client.post('/analyze', json={'text': text, 'sensitivity': 60})
+    miss_time = time.perf_counter() - start
+    start = time.perf_counter()
+    second = client.post('/analyze', json={'text': text.replace('\n', '\r\n'), 'sensitivity': 60})
+    hit_time = time.perf_counter() - start
+    print(f"  miss {miss_time * 1000:.1f}ms, hit {hit_time * 1000:.2f}ms")
+
+    assert first.headers['X-Cache'] == 'MISS' and second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+    assert first.get_json() == json.loads(json.dumps(find_all_rhymes(text, sensitivity_to_threshold(60))))
+    assert client.post('/analyze', json={'text': text, 'sensitivity': 61}).headers['X-Cache'] == 'MISS'
+    assert 'multisyllabic_rhymes' in client.post('/analyze', json={'text': text, 'sensitivity': 60,
+                                                                   'multisyllabic': True}).get_json()
+    assert client.get('/cache-stats').get_json()['responses']['hits'] == 1
+
+    print("\n5. Editing sessions share cached first analyses with /analyze:")
+    session = client.post('/analyze-session', json={'text': text, 'sensitivity': 60})
+    data = session.get_json()
+    assert session.headers['X-Cache'] == 'HIT' and data['version'] == 0
+    assert {k: v for k, v in data.items() if k not in ('session_id', 'version')} == first.get_json()
+    edited = client.patch(f"/analyze-session/{data['session_id']}",
+                          json={'changes': [{'start': 0, 'delete': 1, 'lines': ['a new first line']}]})
+    assert edited.status_code == 200 and edited.get_json()['version'] == 1
+
+    other = 'cat in a hat\nbat on a mat'
+    assert client.post('/analyze-session', json={'text': other}).headers['X-Cache'] == 'MISS'
+    assert client.post('/analyze', json={'text': other}).headers['X-Cache'] == 'HIT'
+    # Unnormalized text keeps its own lines in the session, so it is analyzed as sent
+    assert 'X-Cache' not in client.post('/analyze-session', json={'text': other + '  '}).headers
+
+    print("\n6. An unusable cache file never fails an analysis:")
+    with contextlib.redirect_stdout(io.StringIO()):
+        app_module.response_cache = ResponseCache(path='/nonexistent/dir/cache.sqlite3')
+        for endpoint in ('/analyze', '/analyze-session', '/analyze'):
+            response = client.post(endpoint, json={'text': other})
+            assert response.status_code == 200 and response.get_json()['groups'], endpoint
+    assert response.headers['X-Cache'] == 'HIT'
+
+if __name__ == "__main__":
+    test_response_cache()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Check the bucketed grouping engine against the original pairwise loop"""
+
+import sys
+import os
+import pronouncing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import extract_words, group_rhyme_words, group_by_similarity_matrix
+from benchmark_grouping import synthetic_lyrics, legacy_group_rhyme_words, group_keys
+
+SAMPLE_TEXT = """Tripping off the beat kinda, dripping off the meat grinder
+Heat niner, pimping, stripping, soft sweet minor
+China was a neat signer, trouble with the script
+The magnificent different president, evident hesitant"""
+
+def test_rhyme_grouping():
+    print("=== TESTING BUCKETED RHYME GROUPING ===\n")
+
+    texts = {
+        'sample': SAMPLE_TEXT,
+        'synthetic': synthetic_lyrics(600, vocabulary_size=400),
+    }
+
+    for name, text in texts.items():
+        all_words = extract_words(text.split('\n'))
+        for threshold in (0.0, 0.4, 0.58, 0.7, 0.95, 1.0):
+            bucketed = group_keys(group_rhyme_words(all_words, threshold))
+            pairwise = group_keys(legacy_group_rhyme_words(all_words, threshold))
+            print(f"  {name} @ {threshold}: {len(bucketed)} groups")
+            assert bucketed == pairwise, f"{name} groups differ at threshold {threshold}"
+
+            vectorized = group_keys(group_by_similarity_matrix(all_words, threshold))
+            assert vectorized == pairwise, f"{name} matrix groups differ at threshold {threshold}"
+
+            # Recorded match kinds agree with a fresh pronouncing.rhymes() check on the head
+            for group in group_by_similarity_matrix(all_words, threshold):
+                head_rhymes = set(pronouncing.rhymes(group[0]['clean']))
+                for word in group[1:]:
+                    assert word['match'] == ('exact' if word['clean'] in head_rhymes else 'similar')
+            matches = [[w['match'] for w in g[1:]] for g in group_rhyme_words(all_words, threshold)]
+            assert matches == [[w['match'] for w in g[1:]] for g in group_by_similarity_matrix(all_words, threshold)]
+
+if __name__ == "__main__":
+    test_rhyme_grouping()
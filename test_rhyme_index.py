@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Test the precomputed rhyming-part index used for exact rhyme lookups"""
+
+import sys
+import os
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pronouncing
+import app as app_module
+from app import exact_rhymes_for_phones, build_rhyme_index, find_all_rhymes, get_rhyming_part
+
+def index_rhymes(word, lookup):
+    """pronouncing.rhymes(word), answered from a rhyming part -> words lookup"""
+    # Like pronouncing.rhymes, only the first pronunciation counts
+    return set(lookup(pronouncing.phones_for_word(word)[0])) - {word}
+
+def test_rhyme_index():
+    print("=== TESTING RHYME INDEX ===\n")
+    pronouncing.init_cmu()
+    rng = random.Random(1)
+    words = rng.sample(sorted({word for word, _ in pronouncing.pronunciations}), 300) + ['cat', 'orange', 'dressed']
+    index = build_rhyme_index()
+
+    print(f"1. Index lookups match pronouncing.rhymes for {len(words)} CMU words:")
+    for word in words:
+        expected = set(pronouncing.rhymes(word))
+        assert index_rhymes(word, lambda phones: index.get(get_rhyming_part(phones), frozenset())) == expected, word
+        assert index_rhymes(word, exact_rhymes_for_phones) == expected, word
+    print(f"  'cat' has {len(pronouncing.rhymes('cat'))} rhymes, 'orange' has {len(pronouncing.rhymes('orange'))}")
+    assert exact_rhymes_for_phones(None) == exact_rhymes_for_phones('') == frozenset()
+
+    print("\n2. Analysis never scans the dictionary per word:")
+    rhymes = pronouncing.rhymes
+    def scan(word):
+        raise AssertionError(f"pronouncing.rhymes({word!r}) called during analysis")
+    pronouncing.rhymes = scan
+    try:
+        app_module.rhyming_words.cache_clear()
+        text = "the cat in the hat\nsat on a mat\nI got dressed\nthen I bench-pressed"
+        analysis = find_all_rhymes(text, 0.95)
+    finally:
+        pronouncing.rhymes = rhymes
+    groups = [sorted(w['clean'] for w in group['words']) for group in analysis['groups']]
+    lookups = app_module.rhyming_words.cache_info()
+    print(f"  {groups}, {lookups.misses} distinct rhyming parts looked up")
+    assert ['cat', 'hat', 'mat', 'sat'] in groups and ['benchpressed', 'dressed'] in groups
+    # At most one index hit per distinct word, however large the dictionary
+    assert 0 < lookups.misses <= len(set(text.split()))
+
+if __name__ == "__main__":
+    test_rhyme_index()
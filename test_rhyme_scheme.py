@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Test line-level rhyme scheme labels"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, find_all_rhymes, find_rhyme_scheme, rhyme_label, RhymeDocument
+from benchmark_grouping import synthetic_lyrics
+
+def test_rhyme_scheme():
+    print("=== TESTING RHYME SCHEME ===\n")
+
+    print("1. Labels continue past Z:")
+    assert [rhyme_label(i) for i in (0, 25, 26, 27, 701, 702)] == ['A', 'Z', 'AA', 'AB', 'ZZ', 'AAA']
+    groups = find_all_rhymes(synthetic_lyrics(800, vocabulary_size=400))['groups']
+    letters = [group['letter'] for group in groups]
+    print(f"  {len(groups)} groups, last {letters[-1]}")
+    assert len(groups) > 26 and len(set(letters)) == len(letters)
+    assert all(letter.isalpha() and letter.isupper() for letter in letters)
+
+    print("\n2. End words label lines:")
+    text = "Roses are red\nViolets are blue\nI read what you said\n\nAnd I'm thinking of you"
+    result = find_rhyme_scheme(text)
+    print(f"  {result['scheme']}")
+    assert result['scheme'] == ['A', 'B', 'A', None, 'B']
+    assert result['end_words'] == ['red', 'blue', 'said', None, 'you']
+
+    print("\n3. /scheme, /analyze and sessions agree:")
+    client = app.test_client()
+    long_text = synthetic_lyrics(2000, vocabulary_size=600)
+    scheme = client.post('/scheme', json={'text': long_text}).get_json()['scheme']
+    assert client.post('/analyze', json={'text': long_text}).get_json()['scheme'] == scheme
+    assert RhymeDocument(long_text).analyze()['scheme'] == scheme
+    assert client.post('/scheme', json={'text': ''}).status_code == 400
+
+    print("\n4. The scheme pass is much cheaper than full analysis:")
+    start = time.perf_counter()
+    find_rhyme_scheme(long_text)
+    scheme_time = time.perf_counter() - start
+    start = time.perf_counter()
+    find_all_rhymes(long_text)
+    full_time = time.perf_counter() - start
+    print(f"  scheme {scheme_time * 1000:.1f}ms, full analysis {full_time * 1000:.1f}ms")
+    assert scheme_time < full_time / 2
+
+if __name__ == "__main__":
+    test_rhyme_scheme()